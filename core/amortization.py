@@ -0,0 +1,108 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=1024)
+def annuity_factor(annual_rate, tenure):
+    """Monthly installment per unit of principal.
+
+    ``annual_rate`` is in percent and ``tenure`` in months. Applications
+    cluster on a few standard tenures and the corrected rates of 12 and 16,
+    so the cache stays small and nearly every call is a hit.
+    """
+    monthly_rate = annual_rate / (12 * 100)
+    growth = (1 + monthly_rate) ** tenure
+    return monthly_rate * growth / (growth - 1)
+
+
+def annuity_factors(annual_rates, tenures):
+    """Vectorized ``annuity_factor`` for array inputs.
+
+    Each distinct (rate, tenure) pair goes through the scalar cache and is
+    broadcast back, so batch results match the scalar ones exactly.
+    """
+    annual_rates, tenures = np.broadcast_arrays(
+        np.asarray(annual_rates, dtype=float), np.asarray(tenures, dtype=np.int64)
+    )
+    rates, rate_index = np.unique(annual_rates, return_inverse=True)
+    terms, term_index = np.unique(tenures, return_inverse=True)
+    if rates.size * terms.size <= max(annual_rates.size, 1024):
+        # Few distinct values on each axis: fill the whole rate x tenure grid.
+        table = np.array(
+            [
+                [annuity_factor(rate, term) for term in terms.tolist()]
+                for rate in rates.tolist()
+            ]
+        ).reshape(rates.size, terms.size)
+        factors = table[rate_index, term_index]
+    else:
+        pair_index = rate_index.ravel() * terms.size + term_index.ravel()
+        pairs, inverse = np.unique(pair_index, return_inverse=True)
+        rates, terms = rates.tolist(), terms.tolist()
+        factors = np.array(
+            [
+                annuity_factor(rates[pair // len(terms)], terms[pair % len(terms)])
+                for pair in pairs.tolist()
+            ]
+        )[inverse]
+    return factors.reshape(annual_rates.shape)
+
+
+# Stored schedules are three little-endian float64 rows of ``tenure`` values:
+# principal repaid, interest charged and outstanding balance per installment.
+SCHEDULE_DTYPE = np.dtype("<f8")
+
+
+def amortization_schedules(loan_amounts, monthly_payments, interest_rates, tenure):
+    """Schedules for a batch of loans that share one ``tenure``.
+
+    Returns ``(principal, interest, balance)`` arrays of shape
+    ``(loans, tenure)``. Each installment first covers the month's interest;
+    the last one repays whatever principal is left, so the balance always
+    ends at zero even when the stored installment was rounded.
+    """
+    balance = np.array(loan_amounts, dtype=float)
+    payments = np.asarray(monthly_payments, dtype=float)
+    monthly_rates = np.asarray(interest_rates, dtype=float) / (12 * 100)
+    principal = np.empty((balance.size, tenure))
+    interest = np.empty((balance.size, tenure))
+    balances = np.empty((balance.size, tenure))
+    for month in range(tenure):
+        interest[:, month] = balance * monthly_rates
+        if month == tenure - 1:
+            principal[:, month] = balance
+        else:
+            principal[:, month] = np.minimum(payments - interest[:, month], balance)
+        balance = balance - principal[:, month]
+        balances[:, month] = balance
+    return principal, interest, balances
+
+
+def packed_schedules(loan_amounts, monthly_payments, interest_rates, tenures):
+    """Packed schedule bytes for each loan, in input order.
+
+    Loans are grouped by tenure and each group is amortized in one
+    vectorized pass.
+    """
+    loan_amounts = np.asarray(loan_amounts, dtype=float)
+    monthly_payments = np.asarray(monthly_payments, dtype=float)
+    interest_rates = np.asarray(interest_rates, dtype=float)
+    tenures = np.asarray(tenures, dtype=np.int64)
+    packed = [None] * tenures.size
+    for tenure in np.unique(tenures).tolist():
+        (rows,) = np.nonzero(tenures == tenure)
+        schedule = np.stack(
+            amortization_schedules(
+                loan_amounts[rows], monthly_payments[rows], interest_rates[rows], tenure
+            ),
+            axis=1,
+        ).astype(SCHEDULE_DTYPE)
+        for row, values in zip(rows.tolist(), schedule):
+            packed[row] = values.tobytes()
+    return packed
+
+
+def unpack_schedule(data):
+    """Return ``(principal, interest, balance)`` arrays from packed bytes."""
+    return np.frombuffer(data, dtype=SCHEDULE_DTYPE).reshape(3, -1)
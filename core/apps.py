@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from prometheus_client import REGISTRY
+
+        from . import signals  # noqa: F401
+        from .metrics import DatabasePoolCollector, install_query_counter
+
+        REGISTRY.register(DatabasePoolCollector())
+        connection_created.connect(install_query_counter)
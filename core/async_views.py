@@ -0,0 +1,139 @@
+"""Async versions of the read and eligibility endpoints for ASGI servers.
+
+Enabled by the ASYNC_VIEWS setting, which swaps them in for the DRF
+views of the same name in ``core.urls``. They await the async ORM and
+cache calls, so an ASGI worker keeps serving other requests while
+database or Redis I/O is outstanding. Request parsing and response
+shapes are shared with ``core.views``.
+"""
+
+import json
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from .cache import aget_customer, aget_customer_loans, aget_loan, customer_loan_rows
+from .models import Customer, Loan
+from .profiles import aget_credit_history
+from .renderers import NDJSONRenderer, ndjson_line
+from .routers import areplica_reads, primary_reads
+from .utils import score_loan_application
+from .serializers import customer_loan_item, loan_detail_data
+from .views import (
+    eligibility_data,
+    next_page_headers,
+    parse_eligibility_request,
+    parse_page_params,
+)
+
+
+def error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+class AsyncAPIView(View):
+    """Plain async Django view that, like DRF's APIView, skips CSRF."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+
+class CheckEligibilityView(AsyncAPIView):
+    async def post(self, request):
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body or b"{}")
+            except json.JSONDecodeError:
+                return error("Invalid JSON body", 400)
+        else:
+            data = request.POST
+        if not isinstance(data, dict):
+            return error("Request body must be a JSON object", 400)
+
+        try:
+            customer_id, loan_amount, interest_rate, tenure = parse_eligibility_request(
+                data
+            )
+        except ValueError as e:
+            return error(str(e), 400)
+
+        async with areplica_reads(customer_id):
+            try:
+                customer = await aget_customer(customer_id)
+            except Customer.DoesNotExist:
+                return error("Customer not found", 404)
+
+            try:
+                history = await aget_credit_history(customer)
+            except Exception as e:
+                return error(f"An error occurred: {str(e)}", 500)
+
+        result = score_loan_application(
+            customer, loan_amount, interest_rate, tenure, history
+        )
+
+        return JsonResponse(eligibility_data(customer, interest_rate, tenure, result))
+
+
+class ViewLoanDetail(AsyncAPIView):
+    async def get(self, request, loan_id):
+        try:
+            async with areplica_reads() as loan_on_replica:
+                loan = await aget_loan(loan_id)
+            async with areplica_reads(loan["customer_id"]) as on_replica:
+                if loan_on_replica and not on_replica:
+                    # Inside the customer's read-your-writes window the
+                    # replica's copy of the loan may be stale as well.
+                    loan = await aget_loan(loan_id)
+                customer = await aget_customer(loan["customer_id"])
+        except (Loan.DoesNotExist, Customer.DoesNotExist):
+            # A loan created moments ago may not have replicated yet.
+            try:
+                with primary_reads():
+                    loan = await aget_loan(loan_id)
+                    customer = await aget_customer(loan["customer_id"])
+            except (Loan.DoesNotExist, Customer.DoesNotExist):
+                return error("Loan not found", 404)
+
+        return JsonResponse(loan_detail_data(loan, customer))
+
+
+class ViewCustomerLoans(AsyncAPIView):
+    async def get(self, request, customer_id):
+        async with areplica_reads(customer_id):
+            try:
+                await aget_customer(customer_id)
+            except Customer.DoesNotExist:
+                return error("Customer not found", 404)
+
+            try:
+                cursor, page_size = parse_page_params(request.GET)
+            except ValueError as e:
+                return error(str(e), 400)
+
+            wants_ndjson = request.GET.get("format") == NDJSONRenderer.format
+            if wants_ndjson or NDJSONRenderer.media_type in request.headers.get(
+                "Accept", ""
+            ):
+                rows = customer_loan_rows(customer_id, after=cursor)
+                # The stream is consumed after this block exits, so pin the
+                # database chosen for it now.
+                return StreamingHttpResponse(
+                    self.stream(rows.using(rows.db)),
+                    content_type=NDJSONRenderer.media_type,
+                )
+
+            rows, next_cursor = await aget_customer_loans(
+                customer_id, cursor, page_size
+            )
+
+        response = JsonResponse([customer_loan_item(*row) for row in rows], safe=False)
+        for header, value in next_page_headers(request, next_cursor).items():
+            response[header] = value
+        return response
+
+    async def stream(self, rows):
+        async for row in rows:
+            yield ndjson_line(customer_loan_item(*row))
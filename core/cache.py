@@ -0,0 +1,297 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from prometheus_client import Counter
+
+from .metrics import timed
+from .models import Customer, CustomerCreditProfile, Loan
+from .routers import awrote_recently, reading_from_replica, wrote_recently
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "credit_cache_requests_total",
+    "Read-through cache lookups by kind of object and result",
+    ["kind", "result"],
+)
+
+LOAN_SUMMARY_FIELDS = [
+    "loan_id",
+    "loan_amount",
+    "interest_rate",
+    "monthly_payment",
+    "tenure",
+    "emis_paid_on_time",
+]
+
+_MISSING = object()
+
+
+def _key(kind, pk):
+    return f"{kind}:{pk}"
+
+
+def _fill_allowed(value, owner):
+    """Whether a freshly loaded ``value`` may be written to the cache.
+
+    A replica read inside the owning customer's read-your-writes window
+    may predate their own write, and caching it would serve that stale
+    row for the whole CACHE_TTL.
+    """
+    if value is None:
+        return False
+    return not (reading_from_replica() and wrote_recently(owner(value)))
+
+
+async def _afill_allowed(value, owner):
+    """Async ``_fill_allowed``."""
+    if value is None:
+        return False
+    return not (reading_from_replica() and await awrote_recently(owner(value)))
+
+
+def _read_through(kind, pk, load, owner=None):
+    """Return the cached ``kind`` object for ``pk``, loading it on a miss.
+
+    ``owner`` maps the loaded value to the id of the customer it belongs
+    to and defaults to ``pk``. ``None`` results are not cached, nor are
+    replica reads for customers inside their read-your-writes window.
+    Cache errors are logged and counted, and the lookup falls back to the
+    database so Redis is never required to serve a request.
+    """
+    key = _key(kind, pk)
+    try:
+        with timed("cache"):
+            value = cache.get(key, _MISSING)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        CACHE_REQUESTS.labels(kind, "error").inc()
+        return load()
+
+    if value is not _MISSING:
+        CACHE_REQUESTS.labels(kind, "hit").inc()
+        return value
+
+    CACHE_REQUESTS.labels(kind, "miss").inc()
+    value = load()
+    if _fill_allowed(value, owner or (lambda _: pk)):
+        try:
+            with timed("cache"):
+                cache.set(key, value)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+    return value
+
+
+def get_customer(customer_id):
+    """Return the Customer, raising ``Customer.DoesNotExist`` if unknown."""
+    customer_id = int(customer_id)
+    customer = _read_through(
+        "customer",
+        customer_id,
+        lambda: Customer.objects.filter(customer_id=customer_id).first(),
+    )
+    if customer is None:
+        raise Customer.DoesNotExist(f"Customer {customer_id} not found")
+    return customer
+
+
+def get_credit_profile(customer_id):
+    """Return the stored CustomerCreditProfile, or ``None`` if not built."""
+    return _read_through(
+        "credit_profile",
+        customer_id,
+        lambda: CustomerCreditProfile.objects.filter(customer_id=customer_id).first(),
+    )
+
+
+def customer_loan_rows(customer_id, after=None):
+    """Return ``customer_id``'s loans as LOAN_SUMMARY_FIELDS tuples.
+
+    Rows come in ``loan_id`` order, starting after the ``after`` cursor,
+    so pages are keyset scans instead of OFFSET scans.
+    """
+    loans = Loan.objects.filter(customer_id=customer_id)
+    if after is not None:
+        loans = loans.filter(loan_id__gt=after)
+    return loans.order_by("loan_id").values_list(*LOAN_SUMMARY_FIELDS)
+
+
+def _split_page(rows, page_size):
+    """Split ``page_size + 1`` fetched rows into ``(page, next_cursor)``."""
+    if len(rows) > page_size:
+        return rows[:page_size], rows[page_size - 1][0]
+    return rows, None
+
+
+def get_customer_loans(customer_id, after=None, page_size=None):
+    """Return ``(rows, next_cursor)`` for one page of a customer's loans.
+
+    ``next_cursor`` is ``None`` on the last page. Only the first page at
+    the default size is cached, since that is what almost every request
+    asks for and it keeps invalidation to a single key per customer.
+    """
+    default_size = settings.CUSTOMER_LOANS_PAGE_SIZE
+    page_size = page_size or default_size
+
+    def load():
+        rows = list(customer_loan_rows(customer_id, after)[: page_size + 1])
+        return _split_page(rows, page_size)
+
+    if after is None and page_size == default_size:
+        return _read_through("customer_loans", customer_id, load)
+    return load()
+
+
+def _loan_row(loan_id):
+    return Loan.objects.filter(loan_id=loan_id).values(
+        "customer_id", *LOAN_SUMMARY_FIELDS
+    )
+
+
+def _loan_owner(loan):
+    return loan["customer_id"]
+
+
+def get_loan(loan_id):
+    """Return a loan's summary row, raising ``Loan.DoesNotExist`` if unknown."""
+    loan_id = int(loan_id)
+    loan = _read_through(
+        "loan",
+        loan_id,
+        lambda: _loan_row(loan_id).first(),
+        owner=_loan_owner,
+    )
+    if loan is None:
+        raise Loan.DoesNotExist(f"Loan {loan_id} not found")
+    return loan
+
+
+# Async variants for the ASGI views. They share keys, loaders and
+# metrics with the functions above, so both sides see the same entries.
+
+
+async def _aread_through(kind, pk, load, owner=None):
+    """Async ``_read_through``; ``load`` is a coroutine function."""
+    key = _key(kind, pk)
+    try:
+        with timed("cache"):
+            value = await cache.aget(key, _MISSING)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        CACHE_REQUESTS.labels(kind, "error").inc()
+        return await load()
+
+    if value is not _MISSING:
+        CACHE_REQUESTS.labels(kind, "hit").inc()
+        return value
+
+    CACHE_REQUESTS.labels(kind, "miss").inc()
+    value = await load()
+    if await _afill_allowed(value, owner or (lambda _: pk)):
+        try:
+            with timed("cache"):
+                await cache.aset(key, value)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+    return value
+
+
+async def aget_customer(customer_id):
+    customer_id = int(customer_id)
+    customer = await _aread_through(
+        "customer",
+        customer_id,
+        lambda: Customer.objects.filter(customer_id=customer_id).afirst(),
+    )
+    if customer is None:
+        raise Customer.DoesNotExist(f"Customer {customer_id} not found")
+    return customer
+
+
+async def aget_credit_profile(customer_id):
+    return await _aread_through(
+        "credit_profile",
+        customer_id,
+        lambda: CustomerCreditProfile.objects.filter(customer_id=customer_id).afirst(),
+    )
+
+
+async def aget_customer_loans(customer_id, after=None, page_size=None):
+    default_size = settings.CUSTOMER_LOANS_PAGE_SIZE
+    page_size = page_size or default_size
+
+    async def load():
+        rows = customer_loan_rows(customer_id, after)[: page_size + 1]
+        return _split_page([row async for row in rows], page_size)
+
+    if after is None and page_size == default_size:
+        return await _aread_through("customer_loans", customer_id, load)
+    return await load()
+
+
+async def aget_loan(loan_id):
+    loan_id = int(loan_id)
+    loan = await _aread_through(
+        "loan", loan_id, lambda: _loan_row(loan_id).afirst(), owner=_loan_owner
+    )
+    if loan is None:
+        raise Loan.DoesNotExist(f"Loan {loan_id} not found")
+    return loan
+
+
+def _delete(keys):
+    try:
+        with timed("cache"):
+            cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+
+def _clear():
+    try:
+        cache.clear()
+    except Exception as e:
+        logger.warning(f"Cache clear failed: {e}")
+
+
+def _invalidate(keys):
+    # Drop the keys now so the rest of this transaction reads fresh rows,
+    # and again after commit in case a concurrent request cached the
+    # pre-commit state in between.
+    _delete(keys)
+    transaction.on_commit(lambda: _delete(keys))
+
+
+def invalidate_customers(customer_ids):
+    """Forget the cached customer, credit profile and loan list of each id."""
+    _invalidate(
+        [
+            _key(kind, customer_id)
+            for customer_id in customer_ids
+            for kind in ("customer", "credit_profile", "customer_loans")
+        ]
+    )
+
+
+def invalidate_customer(customer_id):
+    """Forget the cached customer, credit profile and loan list."""
+    invalidate_customers([customer_id])
+
+
+def invalidate_loan(loan):
+    """Forget ``loan`` and everything cached for the customer holding it."""
+    invalidate_customer(loan.customer_id)
+    _invalidate([_key("loan", loan.loan_id)])
+
+
+def invalidate_all():
+    """Drop the whole cache after bulk writes that bypass model signals.
+
+    CACHES points at a Redis database of its own, so this never touches
+    the Celery broker.
+    """
+    _clear()
+    transaction.on_commit(_clear)
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, Power
+
+from .cache import invalidate_all, invalidate_customer
+from .models import Customer, CustomerCreditProfile, JobRun, Loan
+
+JOB_NAME = "recompute_current_debt"
+
+# Profile writes from transactions that were still open when the previous
+# run read its watermark commit with an earlier updated_at; re-scanning a
+# few minutes back picks them up.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Past this many changed customers a full pass is cheaper than a
+# primary-key list, and clearing the cache beats deleting keys one by one.
+INCREMENTAL_LIMIT = 10_000
+
+
+def outstanding_principal():
+    """SQL expression for a loan's principal left after its paid installments.
+
+    ``emis_paid_on_time`` installments of ``monthly_payment`` are applied to
+    the amortizing balance, the same arithmetic the stored schedules use.
+    """
+    monthly_rate = F("interest_rate") / Value(1200.0)
+    growth = Power(Value(1.0) + monthly_rate, F("emis_paid_on_time"))
+    return Greatest(
+        Case(
+            When(emis_paid_on_time__gte=F("tenure"), then=Value(0.0)),
+            When(
+                interest_rate=0,
+                then=F("loan_amount") - F("monthly_payment") * F("emis_paid_on_time"),
+            ),
+            default=F("loan_amount") * growth
+            - F("monthly_payment") * (growth - Value(1.0)) / monthly_rate,
+            output_field=FloatField(),
+        ),
+        Value(0.0),
+    )
+
+
+def update_current_debt(run):
+    """Set ``current_debt`` to the outstanding principal of each customer's loans.
+
+    A single UPDATE sums every loan's outstanding principal per customer.
+    Incremental runs (``run.full`` unset) only touch customers whose credit
+    profile, which is rewritten whenever their loans change, moved since
+    the previous run's watermark. Returns the number of customers updated.
+    """
+    customers = Customer.objects.all()
+    changed = None
+    previous = (
+        JobRun.objects.filter(job=JOB_NAME, finished_at__isnull=False)
+        .exclude(pk=run.pk)
+        .order_by("-watermark")
+        .first()
+    )
+    if not run.full and previous is not None:
+        changed = list(
+            CustomerCreditProfile.objects.filter(
+                updated_at__gte=previous.watermark - WATERMARK_OVERLAP
+            ).values_list("customer_id", flat=True)[: INCREMENTAL_LIMIT + 1]
+        )
+        if len(changed) > INCREMENTAL_LIMIT:
+            changed = None
+        else:
+            customers = customers.filter(pk__in=changed)
+    run.full = changed is None
+
+    debt = (
+        Loan.objects.filter(customer_id=OuterRef("pk"))
+        .order_by()
+        .values("customer_id")
+        .annotate(total=Sum(outstanding_principal()))
+        .values("total")
+    )
+    touched = customers.update(
+        current_debt=Coalesce(Subquery(debt, output_field=FloatField()), Value(0.0))
+    )
+
+    if changed is None:
+        invalidate_all()
+    else:
+        for customer_id in changed:
+            invalidate_customer(customer_id)
+    return touched
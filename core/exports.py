@@ -0,0 +1,242 @@
+import os
+from datetime import date
+from itertools import groupby
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db import connections, models
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Customer, Loan
+
+JOB_NAME = "export_parquet"
+
+# Loan columns written to the Parquet files; start_month is not among them
+# because it is encoded in the hive-style partition directory name.
+LOAN_EXPORT_FIELDS = [
+    "loan_id",
+    "customer_id",
+    "loan_amount",
+    "tenure",
+    "interest_rate",
+    "monthly_payment",
+    "emis_paid_on_time",
+    "start_date",
+    "end_date",
+]
+CUSTOMER_EXPORT_FIELDS = [field.attname for field in Customer._meta.concrete_fields]
+
+PART_NAME = "part-0.parquet"
+
+
+def _arrow_type(field):
+    if isinstance(field, (models.AutoField, models.IntegerField, models.ForeignKey)):
+        return pa.int64()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(model, fields):
+    """Parquet schema for the ``fields`` attnames of ``model``."""
+    by_attname = {field.attname: field for field in model._meta.concrete_fields}
+    return pa.schema(
+        [
+            pa.field(
+                name, _arrow_type(by_attname[name]), nullable=by_attname[name].null
+            )
+            for name in fields
+        ]
+    )
+
+
+def _after(order, values):
+    """``(order...) > (values...)`` spelled out as OR-ed column comparisons."""
+    condition = Q()
+    for position, name in enumerate(order):
+        condition |= Q(
+            **dict(zip(order[:position], values[:position])),
+            **{f"{name}__gt": values[position]},
+        )
+    return condition
+
+
+def iter_batches(queryset, fields, order, batch_size):
+    """Yield lists of ``fields`` tuples, ``batch_size`` rows at a time.
+
+    Uses a server-side cursor where the database allows it. Behind
+    transaction-pooling PgBouncer server-side cursors are disabled, so the
+    rows are walked in keyset pages on ``order`` instead; either way only
+    one batch is held in memory.
+    """
+    columns = [*fields, *(name for name in order if name not in fields)]
+    queryset = queryset.order_by(*order)
+    if not connections[queryset.db].settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+        rows = queryset.values_list(*columns).iterator(chunk_size=batch_size)
+        batch = []
+        for row in rows:
+            batch.append(row[: len(fields)])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    positions = [columns.index(name) for name in order]
+    after = None
+    while True:
+        page = queryset if after is None else queryset.filter(_after(order, after))
+        rows = list(page.values_list(*columns)[:batch_size])
+        if not rows:
+            return
+        after = tuple(rows[-1][position] for position in positions)
+        yield [row[: len(fields)] for row in rows]
+
+
+class PartitionWriter:
+    """Stream record batches into one Parquet file, published atomically.
+
+    Rows go to a hidden temporary file that replaces ``path`` on close, so
+    a crashed export never leaves a partition that looks complete.
+    """
+
+    def __init__(self, path, schema):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.schema = schema
+        self.writer = pq.ParquetWriter(self.tmp_path, schema)
+        self.rows = 0
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_batch(
+            pa.record_batch(
+                [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(columns, self.schema)
+                ],
+                schema=self.schema,
+            )
+        )
+        self.rows += len(rows)
+
+    def close(self):
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.writer.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _month_ranges(months, pending):
+    """Merge runs of ``pending`` months into ``[start, end)`` date ranges.
+
+    ``months`` lists every month that has loans, in order. A run is only
+    broken by a month being skipped, not by months without loans, so the
+    usual re-run (a few new months at the end) filters on a single range.
+    """
+    pending = set(pending)
+    ranges, extend = [], False
+    for month in months:
+        if month not in pending:
+            extend = False
+            continue
+        if extend:
+            ranges[-1][1] = _next_month(month)
+        else:
+            ranges.append([month, _next_month(month)])
+        extend = True
+    return ranges
+
+
+def loan_partition_path(destination, month):
+    return Path(destination) / "loans" / f"start_month={month:%Y-%m}" / PART_NAME
+
+
+def export_loans(destination, batch_size, overwrite=False):
+    """Write loans to ``loans/start_month=YYYY-MM/`` partitions.
+
+    Months whose partition already exists are skipped, except the current
+    month, which is still filling up. Returns ``(rows, written, skipped)``.
+    """
+    current = _month_start(timezone.localdate())
+    months = [_month_start(day) for day in Loan.objects.dates("start_date", "month")]
+    pending = [
+        month
+        for month in months
+        if overwrite
+        or month >= current
+        or not loan_partition_path(destination, month).exists()
+    ]
+    if not pending:
+        return 0, 0, len(months)
+
+    loans = Loan.objects.filter(
+        Q(
+            *[
+                Q(start_date__gte=start, start_date__lt=end)
+                for start, end in _month_ranges(months, pending)
+            ],
+            _connector=Q.OR,
+        )
+    )
+    schema = arrow_schema(Loan, LOAN_EXPORT_FIELDS)
+    start_date = LOAN_EXPORT_FIELDS.index("start_date")
+    writer, writer_month, rows = None, None, 0
+    try:
+        for batch in iter_batches(
+            loans, LOAN_EXPORT_FIELDS, ["start_date", "loan_id"], batch_size
+        ):
+            for month, month_rows in groupby(
+                batch, key=lambda row: _month_start(row[start_date])
+            ):
+                if month != writer_month:
+                    if writer is not None:
+                        writer.close()
+                    writer = PartitionWriter(
+                        loan_partition_path(destination, month), schema
+                    )
+                    writer_month = month
+                month_rows = list(month_rows)
+                writer.write(month_rows)
+                rows += len(month_rows)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        writer.close()
+    return rows, len(pending), len(months) - len(pending)
+
+
+def export_customers(destination, batch_size):
+    """Rewrite ``customers/part-0.parquet`` with every customer."""
+    writer = PartitionWriter(
+        Path(destination) / "customers" / PART_NAME,
+        arrow_schema(Customer, CUSTOMER_EXPORT_FIELDS),
+    )
+    try:
+        for batch in iter_batches(
+            Customer.objects.all(), CUSTOMER_EXPORT_FIELDS, ["customer_id"], batch_size
+        ):
+            writer.write(batch)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return writer.rows
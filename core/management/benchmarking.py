@@ -0,0 +1,30 @@
+"""Timing helpers shared by the benchmark and load test commands."""
+
+import statistics
+import time
+
+
+def best_ms(func, repeat):
+    """Fastest of ``repeat`` calls to ``func``, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def percentile_ms(latencies, fraction):
+    """``fraction`` percentile of the sorted ``latencies`` in milliseconds.
+
+    ``latencies`` are in seconds; returns None when there are none.
+    """
+    if not latencies:
+        return None
+    index = min(len(latencies) - 1, int(len(latencies) * fraction))
+    return round(latencies[index] * 1000, 2)
+
+
+def mean_ms(latencies):
+    """Mean of ``latencies`` (seconds) in milliseconds, or None when empty."""
+    return round(statistics.fmean(latencies) * 1000, 2) if latencies else None
@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from core.amortization import annuity_factor, annuity_factors
+from core.management.benchmarking import best_ms
+
+RATES = [12.0, 16.0, 8.5, 10.0, 11.75, 14.25]
+TENURES = [6, 12, 24, 36, 48, 60]
+
+
+def uncached_emi(loan_amount, annual_rate, tenure):
+    """The EMI formula as the scorer evaluated it before the factor cache."""
+    monthly_rate = annual_rate / (12 * 100)
+    return (
+        loan_amount
+        * monthly_rate
+        * ((1 + monthly_rate) ** tenure)
+        / (((1 + monthly_rate) ** tenure) - 1)
+    )
+
+
+class Command(BaseCommand):
+    help = "Compare EMI computation with and without the annuity factor cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--applications", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        size = options["applications"]
+        amounts = [float(rng.randrange(10_000, 2_000_000, 1000)) for _ in range(size)]
+        rates = [rng.choice(RATES) for _ in range(size)]
+        tenures = [rng.choice(TENURES) for _ in range(size)]
+        amount_array = np.array(amounts)
+        rate_array = np.array(rates)
+        tenure_array = np.array(tenures)
+
+        def numpy_uncached():
+            monthly_rate = rate_array / (12 * 100)
+            growth = (1 + monthly_rate) ** tenure_array
+            return amount_array * monthly_rate * growth / (growth - 1)
+
+        cases = {
+            "scalar formula": lambda: [
+                uncached_emi(*args) for args in zip(amounts, rates, tenures)
+            ],
+            "scalar cached factor": lambda: [
+                amount * annuity_factor(rate, tenure)
+                for amount, rate, tenure in zip(amounts, rates, tenures)
+            ],
+            "numpy formula": numpy_uncached,
+            "numpy cached factors": lambda: amount_array
+            * annuity_factors(rate_array, tenure_array),
+        }
+        self.stdout.write(f"{size} applications, best of {options['repeat']}")
+        for name, func in cases.items():
+            elapsed = best_ms(func, options["repeat"])
+            self.stdout.write(f"{name:>22}: {elapsed:10.2f} ms")
+        info = annuity_factor.cache_info()
+        self.stdout.write(
+            f"annuity_factor cache: {info.hits} hits, {info.misses} misses"
+        )
@@ -0,0 +1,287 @@
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core.amortization import annuity_factor
+from core.cache import invalidate_all
+from core.management.benchmarking import mean_ms, percentile_ms
+from core.models import Customer, Loan
+from core.profiles import rebuild_all_credit_profiles
+
+ENDPOINTS = ["register", "check-eligibility", "create-loan", "view-loan", "view-loans"]
+
+# Reference date for the synthetic loan book; fixed so that runs on different
+# days seed the same rows and score the same applications.
+DATASET_TODAY = date(2025, 1, 1)
+
+
+def git_commit():
+    """Return the checked-out commit, or GIT_COMMIT when git is unavailable."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+        )
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return os.environ.get("GIT_COMMIT")
+    return result.stdout.strip() + ("-dirty" if dirty else "")
+
+
+def seed_dataset(customers, loans_per_customer, seed=0):
+    """Create ``customers`` customers with ``loans_per_customer`` loans each.
+
+    The same arguments always produce the same rows, so runs on different
+    commits measure the same workload.
+    """
+    rng = random.Random(seed)
+    Customer.objects.bulk_create(
+        [
+            Customer(
+                first_name=f"Bench{i}",
+                last_name="Customer",
+                age=rng.randint(21, 65),
+                phone_number=f"6{i:09d}",
+                monthly_salary=(salary := rng.randrange(20_000, 200_000, 1000)),
+                approved_limit=round(36 * salary, -5),
+            )
+            for i in range(customers)
+        ],
+        batch_size=1000,
+    )
+    customer_ids = list(
+        Customer.objects.filter(phone_number__startswith="6")
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+    loans, debts = [], {}
+    for customer_id in customer_ids:
+        for _ in range(loans_per_customer):
+            amount = rng.randrange(10_000, 1_000_000, 1000)
+            rate = rng.choice([8.5, 10.0, 11.75, 12.0, 14.25, 16.0])
+            tenure = rng.choice([6, 12, 24, 36, 60])
+            monthly_payment = amount * annuity_factor(rate, tenure)
+            start = DATASET_TODAY - timedelta(days=rng.randint(0, 5 * 365))
+            paid = rng.randint(0, tenure)
+            loans.append(
+                Loan(
+                    customer_id=customer_id,
+                    loan_amount=amount,
+                    tenure=tenure,
+                    interest_rate=rate,
+                    monthly_payment=round(monthly_payment, 2),
+                    emis_paid_on_time=paid,
+                    start_date=start,
+                    end_date=start + timedelta(days=30 * tenure),
+                )
+            )
+            debts[customer_id] = debts.get(customer_id, 0) + round(
+                monthly_payment * (tenure - paid), 2
+            )
+    Loan.objects.bulk_create(loans, batch_size=5000)
+
+    Customer.objects.bulk_update(
+        [Customer(pk=pk, current_debt=debt) for pk, debt in debts.items()],
+        ["current_debt"],
+        batch_size=1000,
+    )
+    rebuild_all_credit_profiles()
+    return customer_ids
+
+
+def build_requests(endpoint, count, customer_ids, loan_ids, seed=0):
+    """Return ``count`` deterministic ``(method, path, body)`` requests."""
+    rng = random.Random(f"{seed}:{endpoint}")
+    requests = []
+    for i in range(count):
+        if endpoint == "register":
+            body = {
+                "first_name": f"Bench{i}",
+                "last_name": "Register",
+                "age": rng.randint(21, 65),
+                "phone_number": f"7{i:09d}",
+                "monthly_salary": rng.randrange(20_000, 200_000, 1000),
+            }
+            requests.append(("post", "/register/", body))
+        elif endpoint in ("check-eligibility", "create-loan"):
+            body = {
+                "customer_id": rng.choice(customer_ids),
+                "loan_amount": rng.randrange(10_000, 1_000_000, 1000),
+                "interest_rate": rng.choice([8.5, 10.0, 12.0, 14.25, 16.0]),
+                "tenure": rng.choice([6, 12, 24, 36, 60]),
+            }
+            requests.append(("post", f"/{endpoint}/", body))
+        elif endpoint == "view-loan":
+            requests.append(("get", f"/view-loan/{rng.choice(loan_ids)}/", None))
+        else:
+            requests.append(("get", f"/view-loans/{rng.choice(customer_ids)}/", None))
+    return requests
+
+
+def run_requests(requests, concurrency):
+    """Replay ``requests`` from ``concurrency`` threads and summarise them.
+
+    Each thread has its own test client and database connection, and
+    counts the queries issued by every request it makes.
+    """
+    slices = [requests[i::concurrency] for i in range(concurrency)]
+
+    def worker(batch):
+        client = Client()
+        samples = []
+        try:
+            for method, path, body in batch:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    try:
+                        if method == "post":
+                            response = client.post(
+                                path, body, content_type="application/json"
+                            )
+                        else:
+                            response = client.get(path)
+                        code = response.status_code
+                    except Exception:
+                        code = None
+                    elapsed = time.perf_counter() - started
+                samples.append((elapsed, len(queries), code))
+        finally:
+            connection.close()
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = [s for batch in pool.map(worker, slices) for s in batch]
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed for elapsed, _, _ in samples)
+    query_counts = [count for _, count, _ in samples]
+    statuses = Counter(code for _, _, code in samples)
+    return {
+        "requests": len(samples),
+        # Unhandled exceptions are recorded with a None status.
+        "errors": sum(n for code, n in statuses.items() if code is None or code >= 500),
+        "statuses": {str(code): statuses[code] for code in sorted(statuses, key=str)},
+        "requests_per_second": round(len(samples) / wall, 1) if wall else None,
+        "p50_ms": percentile_ms(latencies, 0.50),
+        "p95_ms": percentile_ms(latencies, 0.95),
+        "p99_ms": percentile_ms(latencies, 0.99),
+        "mean_ms": mean_ms(latencies),
+        "queries_mean": (
+            round(statistics.fmean(query_counts), 2) if query_counts else None
+        ),
+        "queries_max": max(query_counts, default=None),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset in a throwaway test database and benchmark "
+        "every core endpoint in-process at fixed concurrency. Clears the "
+        "configured cache, so point CACHE_URL at a scratch Redis database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--loans-per-customer", type=int, default=10)
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Timed requests per endpoint"
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=50, help="Untimed requests per endpoint"
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS
+        )
+        parser.add_argument("--label", default="", help="Tag stored in the report")
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be positive")
+
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = self.run(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        self.stdout.write(output)
+
+    def run(self, options):
+        invalidate_all()
+        started = time.perf_counter()
+        customer_ids = seed_dataset(
+            options["customers"], options["loans_per_customer"], options["seed"]
+        )
+        loan_ids = list(Loan.objects.values_list("pk", flat=True))
+        seed_seconds = time.perf_counter() - started
+
+        endpoints = {}
+        for endpoint in options["endpoints"]:
+            requests = build_requests(
+                endpoint,
+                options["warmup"] + options["requests"],
+                customer_ids,
+                loan_ids,
+                options["seed"],
+            )
+            run_requests(requests[: options["warmup"]], options["concurrency"])
+            endpoints[endpoint] = run_requests(
+                requests[options["warmup"] :], options["concurrency"]
+            )
+
+        return {
+            "label": options["label"],
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "async_views": settings.ASYNC_VIEWS,
+            "dataset": {
+                "customers": options["customers"],
+                "loans_per_customer": options["loans_per_customer"],
+                "seed": options["seed"],
+                "seed_seconds": round(seed_seconds, 2),
+            },
+            "concurrency": options["concurrency"],
+            "warmup": options["warmup"],
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,61 @@
+import random
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.management.benchmarking import best_ms
+from core.renderers import ORJSONParser, ORJSONRenderer
+from core.serializers import customer_loan_item
+
+
+def loan_payload(size, seed=0):
+    """A ViewCustomerLoans response body listing ``size`` loans."""
+    rng = random.Random(seed)
+    payload = []
+    for loan_id in range(1, size + 1):
+        tenure = rng.choice([6, 12, 24, 36, 60])
+        payload.append(
+            customer_loan_item(
+                loan_id,
+                round(rng.uniform(10000, 2000000), 2),
+                rng.choice([8.5, 10.0, 11.75, 12.0, 14.25, 16.0]),
+                round(rng.uniform(500, 90000), 2),
+                tenure,
+                rng.randint(0, tenure),
+            )
+        )
+    return payload
+
+
+class Command(BaseCommand):
+    help = "Compare stdlib and orjson rendering/parsing of large loan lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[100, 10_000, 100_000]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        backends = {
+            "stdlib": (JSONRenderer(), JSONParser()),
+            "orjson": (ORJSONRenderer(), ORJSONParser()),
+        }
+        self.stdout.write(
+            f"{'loans':>8} {'backend':>8} {'render ms':>10} {'parse ms':>10} "
+            f"{'bytes':>12}"
+        )
+        for size in options["sizes"]:
+            payload = loan_payload(size)
+            for name, (renderer, parser) in backends.items():
+                body = renderer.render(payload)
+                render_ms = best_ms(lambda: renderer.render(payload), options["repeat"])
+                parse_ms = best_ms(
+                    lambda: parser.parse(BytesIO(body)), options["repeat"]
+                )
+                self.stdout.write(
+                    f"{size:>8} {name:>8} {render_ms:>10.2f} {parse_ms:>10.2f} "
+                    f"{len(body):>12}"
+                )
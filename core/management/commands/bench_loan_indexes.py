@@ -0,0 +1,223 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.management.benchmarking import percentile_ms
+from core.models import Loan
+from core.utils import year_range
+
+TABLE = "bench_loans"
+
+# One customer with a long loan history, whose list pages are timed on top
+# of the randomly sampled customers.
+HEAVY_CUSTOMER_ID = 0
+
+# The loan-history query shapes issued by the scorer and the loan list.
+# "extract" variants are what the code ran before the date-range rewrite.
+QUERIES = {
+    "history_extract": f"""
+        SELECT COUNT(*), SUM(loan_amount), SUM(monthly_payment),
+               SUM(emis_paid_on_time), SUM(tenure),
+               COUNT(*) FILTER (WHERE EXTRACT(YEAR FROM start_date) = %(year)s)
+        FROM {TABLE} WHERE customer_id = %(customer_id)s
+    """,
+    "history_range": f"""
+        SELECT COUNT(*), SUM(loan_amount), SUM(monthly_payment),
+               SUM(emis_paid_on_time), SUM(tenure),
+               COUNT(*) FILTER (
+                   WHERE start_date >= %(year_start)s AND start_date < %(year_end)s
+               )
+        FROM {TABLE} WHERE customer_id = %(customer_id)s
+    """,
+    "current_year_extract": f"""
+        SELECT COUNT(*) FROM {TABLE}
+        WHERE customer_id = %(customer_id)s
+          AND EXTRACT(YEAR FROM start_date) = %(year)s
+    """,
+    "current_year_range": f"""
+        SELECT COUNT(*) FROM {TABLE}
+        WHERE customer_id = %(customer_id)s
+          AND start_date >= %(year_start)s AND start_date < %(year_end)s
+    """,
+    "customer_loans_all_columns": f"""
+        SELECT * FROM {TABLE} WHERE customer_id = %(customer_id)s
+    """,
+    "customer_loans": f"""
+        SELECT loan_id, loan_amount, interest_rate, monthly_payment, tenure,
+               emis_paid_on_time
+        FROM {TABLE} WHERE customer_id = %(customer_id)s ORDER BY loan_id
+    """,
+    "customer_loans_page": f"""
+        SELECT loan_id, loan_amount, interest_rate, monthly_payment, tenure,
+               emis_paid_on_time
+        FROM {TABLE}
+        WHERE customer_id = %(customer_id)s AND loan_id > %(after)s
+        ORDER BY loan_id LIMIT %(limit)s
+    """,
+    "heavy_customer_loans_page": f"""
+        SELECT loan_id, loan_amount, interest_rate, monthly_payment, tenure,
+               emis_paid_on_time
+        FROM {TABLE}
+        WHERE customer_id = {HEAVY_CUSTOMER_ID} AND loan_id > %(heavy_after)s
+        ORDER BY loan_id LIMIT %(limit)s
+    """,
+}
+
+
+def _index_ddl():
+    """Build the benchmark's CREATE INDEX statements from Loan's Meta indexes."""
+    statements = []
+    for index in Loan._meta.indexes:
+        columns = [Loan._meta.get_field(name).column for name in index.fields]
+        include = [Loan._meta.get_field(name).column for name in index.include]
+        statement = (
+            f"CREATE INDEX {TABLE}_{index.name} ON {TABLE} ({', '.join(columns)})"
+        )
+        if include:
+            statement += f" INCLUDE ({', '.join(include)})"
+        statements.append(statement)
+    return statements
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark loan-history query plans and latencies on a synthetic "
+        "table, before and after the composite covering index (PostgreSQL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loans", type=int, default=10_000_000)
+        parser.add_argument("--customers", type=int, default=1_000_000)
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=200,
+            help="Random customers timed per query and phase",
+        )
+        parser.add_argument(
+            "--heavy-loans",
+            type=int,
+            default=50_000,
+            help="Loans held by the one customer whose list pages are timed",
+        )
+        parser.add_argument("--year", type=int, default=2024)
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the synthetic table afterwards"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("bench_loan_indexes requires PostgreSQL")
+
+        self.options = options
+        rng = random.Random(0)
+        customer_ids = [
+            rng.randint(1, options["customers"]) for _ in range(options["samples"])
+        ]
+
+        with connection.cursor() as cursor:
+            self.build_table(cursor)
+            try:
+                cursor.execute(
+                    f"CREATE INDEX {TABLE}_customer ON {TABLE} (customer_id)"
+                )
+                self.analyze(cursor)
+                before = self.run_phase(cursor, "before", customer_ids)
+
+                cursor.execute(f"DROP INDEX {TABLE}_customer")
+                for statement in _index_ddl():
+                    cursor.execute(statement)
+                self.analyze(cursor)
+                after = self.run_phase(cursor, "after", customer_ids)
+            finally:
+                if not options["keep"]:
+                    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+        self.stdout.write(
+            "\nquery                         before p50/p95 ms   after p50/p95 ms"
+        )
+        for name in QUERIES:
+            self.stdout.write(
+                f"{name:<30}{before[name][0]:>8.3f}/{before[name][1]:<8.3f}"
+                f"{after[name][0]:>10.3f}/{after[name][1]:.3f}"
+            )
+
+    def build_table(self, cursor):
+        loans, customers = self.options["loans"], self.options["customers"]
+        self.stdout.write(f"Generating {loans} loans for {customers} customers...")
+        started = time.monotonic()
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        # Loans of one customer are spread over the table, as they are when
+        # they arrive over time.
+        cursor.execute(
+            f"""
+            CREATE UNLOGGED TABLE {TABLE} AS
+            SELECT g AS loan_id,
+                   1 + (g %% %(customers)s) AS customer_id,
+                   10000 + random() * 990000 AS loan_amount,
+                   6 + (random() * 54)::int AS tenure,
+                   8 + random() * 10 AS interest_rate,
+                   1000 + random() * 20000 AS monthly_payment,
+                   (random() * 60)::int AS emis_paid_on_time,
+                   DATE '2015-01-01' + (random() * 3650)::int AS start_date,
+                   DATE '2020-01-01' + (random() * 3650)::int AS end_date
+            FROM generate_series(1, %(loans)s) AS g
+            """,
+            {"loans": loans, "customers": customers},
+        )
+        # The heavy customer borrows the terms of the first --heavy-loans rows.
+        cursor.execute(
+            f"""
+            INSERT INTO {TABLE}
+            SELECT %(loans)s + loan_id, {HEAVY_CUSTOMER_ID}, loan_amount, tenure,
+                   interest_rate, monthly_payment, emis_paid_on_time,
+                   start_date, end_date
+            FROM {TABLE}
+            WHERE loan_id <= %(heavy_loans)s
+            """,
+            {"loans": loans, "heavy_loans": self.options["heavy_loans"]},
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (loan_id)")
+        self.stdout.write(f"Table ready in {time.monotonic() - started:.1f}s")
+
+    def analyze(self, cursor):
+        # VACUUM sets the visibility map bits index-only scans depend on.
+        cursor.execute(f"VACUUM ANALYZE {TABLE}")
+
+    def run_phase(self, cursor, phase, customer_ids):
+        year = self.options["year"]
+        year_start, year_end = year_range(year)
+        params = {
+            "year": year,
+            "year_start": year_start,
+            "year_end": year_end,
+            # First page for sampled customers, a page from the middle of the
+            # heavy customer's history, at the view's default page size.
+            "after": 0,
+            "heavy_after": self.options["loans"] + self.options["heavy_loans"] // 2,
+            "limit": settings.CUSTOMER_LOANS_PAGE_SIZE + 1,
+        }
+        latencies = {}
+        for name, sql in QUERIES.items():
+            cursor.execute(
+                f"EXPLAIN (ANALYZE, BUFFERS) {sql}",
+                {**params, "customer_id": customer_ids[0]},
+            )
+            plan = "\n".join(f"    {row[0]}" for row in cursor.fetchall())
+            self.stdout.write(f"\n[{phase}] {name}\n{plan}")
+
+            timings = []
+            for customer_id in customer_ids:
+                started = time.perf_counter()
+                cursor.execute(sql, {**params, "customer_id": customer_id})
+                cursor.fetchall()
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            latencies[name] = (
+                percentile_ms(timings, 0.50),
+                percentile_ms(timings, 0.95),
+            )
+        return latencies
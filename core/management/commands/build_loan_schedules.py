@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import build_loan_schedules
+
+
+class Command(BaseCommand):
+    help = "Store amortization schedules for loans that do not have one yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Rebuild the schedules of every loan, not just missing ones",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Loans amortized per vectorized batch",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the task on a Celery worker instead of running inline",
+        )
+
+    def handle(self, *args, **options):
+        arguments = (options["rebuild"], options["batch_size"])
+        if options["run_async"]:
+            result = build_loan_schedules.delay(*arguments)
+            self.stdout.write(f"Queued loan schedule build as task {result.id}")
+            return
+
+        result = build_loan_schedules(*arguments)
+        if not result["success"]:
+            raise CommandError(result["error"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built {result['built']} loan schedules "
+                f"({result['rows_per_second']} rows/s)"
+            )
+        )
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import export_parquet
+
+
+class Command(BaseCommand):
+    help = (
+        "Export customers and loans to Parquet, with loans partitioned by "
+        "start month"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--destination", default=None, help="Defaults to the EXPORT_DIR setting"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows fetched and written per record batch",
+        )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Rewrite loan partitions that were already exported",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the task on a Celery worker instead of running inline",
+        )
+
+    def handle(self, *args, **options):
+        arguments = (
+            options["destination"],
+            options["batch_size"],
+            options["overwrite"],
+        )
+        if options["run_async"]:
+            result = export_parquet.delay(*arguments)
+            self.stdout.write(f"Queued Parquet export as task {result.id}")
+            return
+
+        result = export_parquet(*arguments)
+        if not result["success"]:
+            raise CommandError(result["error"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {result['customers']} customers and {result['loans']} "
+                f"loans to {result['destination']} "
+                f"({result['partitions_written']} partitions written, "
+                f"{result['partitions_skipped']} skipped, "
+                f"{result['rows_per_second']} rows/s)"
+            )
+        )
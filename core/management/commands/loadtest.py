@@ -0,0 +1,103 @@
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.management.benchmarking import mean_ms, percentile_ms
+from core.models import Customer, Loan
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a running server with concurrent keep-alive GET requests "
+        "against the read endpoints and report throughput and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://localhost:8000")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=30, help="Seconds")
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=1000,
+            help="Customers and loans sampled from the database as targets",
+        )
+        parser.add_argument("--label", default="", help="Tag stored in the report")
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON"
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme != "http":
+            raise CommandError("Only http:// URLs are supported")
+
+        customer_ids = list(
+            Customer.objects.values_list("pk", flat=True)[: options["sample"]]
+        )
+        loan_ids = list(Loan.objects.values_list("pk", flat=True)[: options["sample"]])
+        if not customer_ids or not loan_ids:
+            raise CommandError("Load some customers and loans first")
+        paths = [f"/view-loans/{pk}/" for pk in customer_ids]
+        paths += [f"/view-loan/{pk}/" for pk in loan_ids]
+
+        deadline = time.monotonic() + options["duration"]
+        lock = threading.Lock()
+        latencies, errors = [], []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80)
+            local_latencies, local_errors = [], 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", rng.choice(paths))
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 500:
+                        local_errors += 1
+                except (OSError, http.client.HTTPException):
+                    local_errors += 1
+                    connection.close()
+                    connection = http.client.HTTPConnection(
+                        url.hostname, url.port or 80
+                    )
+                    continue
+                local_latencies.append(time.perf_counter() - started)
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(worker, range(options["concurrency"])))
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+
+        report = {
+            "label": options["label"],
+            "url": options["url"],
+            "concurrency": options["concurrency"],
+            "requests": len(latencies),
+            "errors": sum(errors),
+            "requests_per_second": round(len(latencies) / elapsed, 1),
+            "p50_ms": percentile_ms(latencies, 0.50),
+            "p95_ms": percentile_ms(latencies, 0.95),
+            "p99_ms": percentile_ms(latencies, 0.99),
+            "mean_ms": mean_ms(latencies),
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+            return
+        for name, value in report.items():
+            self.stdout.write(f"{name:>20}: {value}")
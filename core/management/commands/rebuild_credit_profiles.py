@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.profiles import rebuild_all_credit_profiles
+
+
+class Command(BaseCommand):
+    help = "Rebuild every CustomerCreditProfile from the loan table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of customers rebuilt per query batch",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_all_credit_profiles(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} credit profiles"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import recompute_current_debt
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute customers' current_debt from the outstanding principal "
+        "of their loans"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Update every customer, not just those whose loans changed",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the task on a Celery worker instead of running inline",
+        )
+
+    def handle(self, *args, **options):
+        if options["run_async"]:
+            result = recompute_current_debt.delay(options["full"])
+            self.stdout.write(f"Queued current_debt recomputation as task {result.id}")
+            return
+
+        result = recompute_current_debt(options["full"])
+        if not result["success"]:
+            raise CommandError(result["error"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Run {result['run_id']} ({'full' if result['full'] else 'incremental'}): "
+                f"updated {result['rows_touched']} customers in "
+                f"{result['duration_seconds']}s"
+            )
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import refresh_loan_rollups
+
+
+class Command(BaseCommand):
+    help = "Fold new loans into the /analytics/ rollup tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild every rollup instead of adding only new loans",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the task on a Celery worker instead of running inline",
+        )
+
+    def handle(self, *args, **options):
+        if options["run_async"]:
+            result = refresh_loan_rollups.delay(options["full"])
+            self.stdout.write(f"Queued loan rollup refresh as task {result.id}")
+            return
+
+        result = refresh_loan_rollups(options["full"])
+        if not result["success"]:
+            raise CommandError(result["error"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Run {result['run_id']} ({'full' if result['full'] else 'incremental'}): "
+                f"folded in {result['rows_touched']} loans in "
+                f"{result['duration_seconds']}s"
+            )
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import rescore_portfolio
+
+
+class Command(BaseCommand):
+    help = "Re-score every customer against a reference loan application"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loan-amount", type=float, required=True)
+        parser.add_argument("--interest-rate", type=float, required=True)
+        parser.add_argument("--tenure", type=int, required=True)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Customers scored per vectorized chunk",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the task on a Celery worker instead of running inline",
+        )
+
+    def handle(self, *args, **options):
+        arguments = (
+            options["loan_amount"],
+            options["interest_rate"],
+            options["tenure"],
+            options["chunk_size"],
+        )
+        if options["run_async"]:
+            result = rescore_portfolio.delay(*arguments)
+            self.stdout.write(f"Queued portfolio re-scoring as task {result.id}")
+            return
+
+        result = rescore_portfolio(*arguments)
+        if not result["success"]:
+            raise CommandError(result["error"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Run {result['run_id']}: scored {result['customers_scored']} "
+                f"customers ({result['rows_per_second']} rows/s)"
+            )
+        )
@@ -0,0 +1,169 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import connections
+from prometheus_client import Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# psycopg_pool get_stats() keys exported as gauges and as counters.
+POOL_GAUGES = {
+    "pool_size": "Connections currently managed by the pool",
+    "pool_available": "Idle connections ready to be handed out",
+    "requests_waiting": "Requests currently queued for a connection",
+}
+POOL_COUNTERS = {
+    "requests_num": "Connections requested from the pool",
+    "requests_queued": "Requests that had to wait for a connection",
+    "requests_errors": "Requests that timed out or failed waiting",
+    "connections_num": "Connections opened to the server",
+    "connections_errors": "Failed attempts to open a connection",
+    "connections_lost": "Connections found broken when checked",
+}
+
+
+class DatabasePoolCollector:
+    """Export psycopg_pool statistics for every pooled database alias.
+
+    Stats are read at scrape time, per process, so each gunicorn worker or
+    Celery child reports its own pool.
+    """
+
+    def collect(self):
+        gauges = {
+            key: GaugeMetricFamily(
+                f"db_pool_{key.removeprefix('pool_')}", doc, labels=["alias"]
+            )
+            for key, doc in POOL_GAUGES.items()
+        }
+        counters = {
+            key: CounterMetricFamily(f"db_pool_{key}", doc, labels=["alias"])
+            for key, doc in POOL_COUNTERS.items()
+        }
+        wait = CounterMetricFamily(
+            "db_pool_wait_seconds",
+            "Total time requests spent waiting for a pooled connection",
+            labels=["alias"],
+        )
+
+        for alias in connections:
+            options = connections.settings[alias].get("OPTIONS", {})
+            if not options.get("pool"):
+                continue
+            stats = connections[alias].pool.get_stats()
+            for key, metric in gauges.items():
+                metric.add_metric([alias], stats.get(key, 0))
+            for key, metric in counters.items():
+                metric.add_metric([alias], stats.get(key, 0))
+            wait.add_metric([alias], stats.get("requests_wait_ms", 0) / 1000)
+
+        yield from gauges.values()
+        yield from counters.values()
+        yield wait
+
+
+# Per-request cost breakdown, labelled by view class. Filled in by
+# core.middleware.RequestBudgetMiddleware from a RequestStats object.
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+VIEW_QUERIES = Histogram(
+    "credit_view_db_queries",
+    "SQL statements issued per request",
+    ["view"],
+    buckets=QUERY_BUCKETS,
+)
+VIEW_DB_SECONDS = Histogram(
+    "credit_view_db_seconds",
+    "Time per request spent executing SQL",
+    ["view"],
+    buckets=TIME_BUCKETS,
+)
+VIEW_CACHE_SECONDS = Histogram(
+    "credit_view_cache_seconds",
+    "Time per request spent talking to the read-through cache",
+    ["view"],
+    buckets=TIME_BUCKETS,
+)
+VIEW_SCORING_SECONDS = Histogram(
+    "credit_view_scoring_seconds",
+    "Time per request spent in the eligibility scorer",
+    ["view"],
+    buckets=TIME_BUCKETS,
+)
+
+
+class RequestStats:
+    """Query count and time spent per kind of work for one request."""
+
+    __slots__ = ("queries", "db", "cache", "scoring")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.cache = 0.0
+        self.scoring = 0.0
+
+
+# Stats for the request being served, or None outside a request. The
+# object is mutable so work done in sync_to_async threads, which run in a
+# copy of the context, still adds to it.
+_request_stats = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def collect_request_stats():
+    """Gather a RequestStats for the work done inside this block."""
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+@contextmanager
+def timed(kind):
+    """Add the time spent in this block to the current request's ``kind``."""
+    stats = _request_stats.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(stats, kind, getattr(stats, kind) + time.perf_counter() - started)
+
+
+def timed_function(kind):
+    """Decorator form of ``timed``."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count_query(execute, sql, params, many, context):
+    """Database execute wrapper feeding the current request's stats."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db += time.perf_counter() - started
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver installing ``count_query``."""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
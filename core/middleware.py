@@ -0,0 +1,125 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from opentelemetry import trace
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import (
+    VIEW_CACHE_SECONDS,
+    VIEW_DB_SECONDS,
+    VIEW_QUERIES,
+    VIEW_SCORING_SECONDS,
+    collect_request_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """A view issued more queries than its budget while in strict mode."""
+
+
+class RequestBudgetMiddleware:
+    """Export per-view query counts and time breakdowns, and police budgets.
+
+    The breakdown goes to the Prometheus histograms, which back the
+    dashboards and alerts, and onto the OpenTelemetry request span, so a
+    slow trace shows where its time went. Only traces are exported over
+    OTLP (``--metrics_exporter none`` in entrypoint.sh and a traces-only
+    collector pipeline), so the histograms are not duplicated there.
+
+    Queries are counted by the execute wrapper installed on every new
+    connection (see ``core.metrics.install_query_counter``). A request over
+    its view's query budget logs a warning, or raises QueryBudgetExceeded
+    when ``QUERY_BUDGET_STRICT`` is on, as it is under ``manage.py test``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with collect_request_stats() as stats:
+            response = self.get_response(request)
+        self.record(request, stats)
+        return response
+
+    async def __acall__(self, request):
+        with collect_request_stats() as stats:
+            response = await self.get_response(request)
+        self.record(request, stats)
+        return response
+
+    def record(self, request, stats):
+        match = request.resolver_match
+        if match is None:
+            return
+        view = getattr(match.func, "view_class", match.func).__name__
+
+        VIEW_QUERIES.labels(view).observe(stats.queries)
+        VIEW_DB_SECONDS.labels(view).observe(stats.db)
+        VIEW_CACHE_SECONDS.labels(view).observe(stats.cache)
+        VIEW_SCORING_SECONDS.labels(view).observe(stats.scoring)
+        # A no-op unless opentelemetry-instrument started a request span.
+        trace.get_current_span().set_attributes(
+            {
+                "credit.view": view,
+                "credit.db.queries": stats.queries,
+                "credit.db.seconds": stats.db,
+                "credit.cache.seconds": stats.cache,
+                "credit.scoring.seconds": stats.scoring,
+            }
+        )
+
+        budget = settings.QUERY_BUDGETS.get(view, settings.QUERY_BUDGET)
+        if stats.queries <= budget:
+            return
+        message = (
+            f"{view} issued {stats.queries} queries for {request.path}, "
+            f"over its budget of {budget}"
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that keeps the middleware chain native async under ASGI.
+
+    WhiteNoiseMiddleware is sync-only, so Django would run every request,
+    API calls included, through a thread when serving the async views.
+    Here only static file hits touch a thread, for the file lookup and open.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(
+                request.path_info
+            )
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(
+                static_file, request
+            )
+        return await self.get_response(request)
@@ -17,8 +17,10 @@ class Customer(models.Model):
 
 class Loan(models.Model):
     loan_id = models.AutoField(primary_key=True)
+    # Lookups by customer use the leading column of the composite indexes
+    # below, so the FK does not need an index of its own.
     customer = models.ForeignKey(
-        Customer, on_delete=models.CASCADE, related_name="loans"
+        Customer, on_delete=models.CASCADE, related_name="loans", db_index=False
     )
     loan_amount = models.FloatField()
     tenure = models.PositiveIntegerField(help_text="Tenure in months")
@@ -28,5 +30,179 @@ class Loan(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
 
+    class Meta:
+        indexes = [
+            # Serves per-customer history and date-range scans. On
+            # PostgreSQL the INCLUDE columns let the scorer and the loan
+            # list run as index-only scans without touching the heap.
+            models.Index(
+                fields=["customer", "start_date"],
+                include=[
+                    "loan_id",
+                    "loan_amount",
+                    "interest_rate",
+                    "monthly_payment",
+                    "tenure",
+                    "emis_paid_on_time",
+                ],
+                name="loan_customer_start_idx",
+            ),
+            # Serves the loan list's keyset pages (customer_id = ? AND
+            # loan_id > ? ORDER BY loan_id LIMIT n) as a range scan that stops
+            # after n entries, however many loans the customer holds.
+            models.Index(fields=["customer", "loan_id"], name="loan_customer_loan_idx"),
+        ]
+
     def __str__(self):
         return f"Loan {self.loan_id} for {self.customer.first_name}"
+
+
+class LoanSchedule(models.Model):
+    """Precomputed amortization schedule for one loan.
+
+    ``data`` holds the arrays packed by ``core.amortization``, one row per
+    loan instead of one per installment.
+    """
+
+    loan = models.OneToOneField(
+        Loan, on_delete=models.CASCADE, primary_key=True, related_name="schedule"
+    )
+    data = models.BinaryField()
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Schedule for loan {self.loan_id}"
+
+
+class CustomerCreditProfile(models.Model):
+    """Running loan aggregates used by the eligibility scorer."""
+
+    customer = models.OneToOneField(
+        Customer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="credit_profile",
+    )
+    loan_count = models.PositiveIntegerField(default=0)
+    total_loan_volume = models.FloatField(default=0)
+    total_emis = models.FloatField(default=0)
+    emis_paid_on_time = models.IntegerField(default=0)
+    total_tenure = models.PositiveIntegerField(default=0)
+    loans_per_year = models.JSONField(
+        default=dict, help_text="Loan count keyed by start year"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def history(self, year):
+        """Return the aggregates in the shape ``score_loan_application`` expects."""
+        return {
+            "loan_count": self.loan_count,
+            "total_loan_volume": self.total_loan_volume,
+            "total_emis": self.total_emis,
+            "emis_paid_on_time": self.emis_paid_on_time,
+            "total_tenure": self.total_tenure,
+            "current_year_loans": self.loans_per_year.get(str(year), 0),
+        }
+
+    def __str__(self):
+        return f"Credit profile for customer {self.customer_id}"
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of a chunked import, committed together with each chunk."""
+
+    key = models.CharField(max_length=255, unique=True)
+    rows_committed = models.PositiveIntegerField(
+        default=0, help_text="Absolute data-row position after the last chunk"
+    )
+    counters = models.JSONField(default=dict)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.rows_committed} rows)"
+
+
+class JobRun(models.Model):
+    """One run of a maintenance job, kept for timing and incremental watermarks."""
+
+    job = models.CharField(max_length=100, db_index=True)
+    full = models.BooleanField(default=False)
+    started_at = models.DateTimeField()
+    # Changes made before this instant are covered by the run; the next
+    # incremental run starts from here.
+    watermark = models.DateTimeField(null=True)
+    # Largest primary key covered, for jobs that follow an append-only table.
+    high_water_id = models.BigIntegerField(null=True)
+    # [first, last, seen_at] loan ID ranges at or below high_water_id that
+    # had not committed when the run read the table; the next run retries
+    # them. seen_at is the epoch time the range was first found empty.
+    pending_ids = models.JSONField(default=list)
+    finished_at = models.DateTimeField(null=True)
+    duration_seconds = models.FloatField(null=True)
+    rows_touched = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.job} run {self.pk} ({self.rows_touched} rows)"
+
+
+class LoanRollup(models.Model):
+    """Pre-aggregated loan totals for one bucket of an analytics dimension."""
+
+    dimension = models.CharField(max_length=20)
+    bucket = models.CharField(max_length=20)
+    # Display order of the bucket within its dimension.
+    sort_key = models.IntegerField()
+    loan_count = models.PositiveIntegerField(default=0)
+    total_amount = models.FloatField(default=0)
+    total_monthly_payment = models.FloatField(default=0)
+    total_tenure = models.PositiveBigIntegerField(default=0)
+    # Sum of interest_rate * loan_amount, for the amount-weighted mean rate.
+    weighted_rate = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "bucket"], name="unique_loan_rollup_bucket"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.bucket} ({self.loan_count} loans)"
+
+
+class PortfolioScoreRun(models.Model):
+    """One bulk re-scoring of every customer against a reference application."""
+
+    loan_amount = models.FloatField()
+    interest_rate = models.FloatField(help_text="Annual interest rate (%)")
+    tenure = models.PositiveIntegerField(help_text="Tenure in months")
+    customers_scored = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    duration_seconds = models.FloatField(null=True)
+
+    def __str__(self):
+        return f"Portfolio score run {self.pk} ({self.customers_scored} customers)"
+
+
+class PortfolioScore(models.Model):
+    run = models.ForeignKey(
+        PortfolioScoreRun, on_delete=models.CASCADE, related_name="scores"
+    )
+    customer = models.ForeignKey(
+        Customer, on_delete=models.CASCADE, related_name="portfolio_scores"
+    )
+    score = models.FloatField()
+    approval = models.BooleanField()
+    corrected_interest_rate = models.FloatField()
+    monthly_installment = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "customer"], name="unique_portfolio_score"
+            )
+        ]
+
+    def __str__(self):
+        return f"Score {self.score} for customer {self.customer_id}"
@@ -0,0 +1,234 @@
+import threading
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Sum
+from django.db.models.functions import ExtractYear
+
+from .cache import aget_credit_profile, get_credit_profile, invalidate_all
+from .models import Customer, CustomerCreditProfile, Loan
+from .routers import primary_reads
+
+PROFILE_FIELDS = [
+    "loan_count",
+    "total_loan_volume",
+    "total_emis",
+    "emis_paid_on_time",
+    "total_tenure",
+    "loans_per_year",
+    "updated_at",
+]
+
+
+def rebuild_credit_profiles(customer_ids):
+    """Recompute the profiles of ``customer_ids`` from their loans.
+
+    Runs two grouped aggregate queries and a single upsert regardless of
+    how many loans the customers hold.
+    """
+    customer_ids = list(customer_ids)
+    if not customer_ids:
+        return 0
+
+    loans = Loan.objects.filter(customer_id__in=customer_ids).order_by()
+    totals = loans.values("customer_id").annotate(
+        loan_count=Count("pk"),
+        total_loan_volume=Sum("loan_amount"),
+        total_emis=Sum("monthly_payment"),
+        emis_paid_on_time=Sum("emis_paid_on_time"),
+        total_tenure=Sum("tenure"),
+    )
+    per_year = loans.values("customer_id", year=ExtractYear("start_date")).annotate(
+        count=Count("pk")
+    )
+
+    loans_per_year = {}
+    for row in per_year:
+        loans_per_year.setdefault(row["customer_id"], {})[str(row["year"])] = row[
+            "count"
+        ]
+
+    profiles = [
+        CustomerCreditProfile(
+            customer_id=row["customer_id"],
+            loan_count=row["loan_count"],
+            total_loan_volume=row["total_loan_volume"] or 0,
+            total_emis=row["total_emis"] or 0,
+            emis_paid_on_time=row["emis_paid_on_time"] or 0,
+            total_tenure=row["total_tenure"] or 0,
+            loans_per_year=loans_per_year.get(row["customer_id"], {}),
+        )
+        for row in totals
+    ]
+    seen = {profile.customer_id for profile in profiles}
+    profiles.extend(
+        CustomerCreditProfile(customer_id=customer_id)
+        for customer_id in customer_ids
+        if customer_id not in seen
+    )
+
+    CustomerCreditProfile.objects.bulk_create(
+        profiles,
+        update_conflicts=True,
+        unique_fields=["customer"],
+        update_fields=PROFILE_FIELDS,
+    )
+    return len(profiles)
+
+
+# Customers whose loans were deleted in the current thread's transaction.
+_pending_rebuilds = threading.local()
+
+
+def rebuild_credit_profiles_on_commit(customer_id):
+    """Rebuild ``customer_id``'s profile once the transaction commits.
+
+    Deleting a customer cascades over all of their loans in one
+    transaction; the ids are collected so the whole cascade costs a single
+    rebuild, and customers that no longer exist by then are skipped rather
+    than given a fresh profile row pointing at nothing.
+    """
+    pending = getattr(_pending_rebuilds, "customer_ids", None)
+    if pending is None:
+        pending = _pending_rebuilds.customer_ids = set()
+    pending.add(customer_id)
+    transaction.on_commit(_rebuild_pending_profiles)
+
+
+def _rebuild_pending_profiles():
+    customer_ids = getattr(_pending_rebuilds, "customer_ids", None)
+    if not customer_ids:
+        return
+    _pending_rebuilds.customer_ids = set()
+    rebuild_credit_profiles(
+        Customer.objects.filter(pk__in=customer_ids).values_list("pk", flat=True)
+    )
+
+
+def rebuild_all_credit_profiles(batch_size=1000):
+    """Rebuild every customer's profile, ``batch_size`` customers at a time."""
+    rebuilt = 0
+    batch = []
+    customer_ids = Customer.objects.order_by("pk").values_list("pk", flat=True)
+    for customer_id in customer_ids.iterator(chunk_size=batch_size):
+        batch.append(customer_id)
+        if len(batch) >= batch_size:
+            rebuilt += rebuild_credit_profiles(batch)
+            batch = []
+    rebuilt += rebuild_credit_profiles(batch)
+
+    # Profiles of deleted customers cascade away; this only catches
+    # leftovers whose loans disappeared without going through the ORM.
+    CustomerCreditProfile.objects.filter(
+        ~Exists(Loan.objects.filter(customer_id=OuterRef("customer_id"))),
+        loan_count__gt=0,
+    ).update(
+        loan_count=0,
+        total_loan_volume=0,
+        total_emis=0,
+        emis_paid_on_time=0,
+        total_tenure=0,
+        loans_per_year={},
+    )
+    invalidate_all()
+    return rebuilt
+
+
+def build_missing_credit_profiles(batch_size=1000):
+    """Build profiles for customers that do not have one yet."""
+    built = 0
+    batch = []
+    customer_ids = Customer.objects.filter(credit_profile__isnull=True).values_list(
+        "pk", flat=True
+    )
+    for customer_id in customer_ids.iterator(chunk_size=batch_size):
+        batch.append(customer_id)
+        if len(batch) >= batch_size:
+            built += rebuild_credit_profiles(batch)
+            batch = []
+    return built + rebuild_credit_profiles(batch)
+
+
+def record_loan(loan):
+    """Fold a newly created ``loan`` into its customer's profile."""
+    with transaction.atomic():
+        try:
+            profile = CustomerCreditProfile.objects.select_for_update().get(
+                customer_id=loan.customer_id
+            )
+        except CustomerCreditProfile.DoesNotExist:
+            # No profile yet: build it from the full history, which
+            # already includes this loan.
+            rebuild_credit_profiles([loan.customer_id])
+            return
+
+        year = str(loan.start_date.year)
+        profile.loan_count += 1
+        profile.total_loan_volume += loan.loan_amount
+        profile.total_emis += loan.monthly_payment
+        profile.emis_paid_on_time += loan.emis_paid_on_time
+        profile.total_tenure += loan.tenure
+        profile.loans_per_year[year] = profile.loans_per_year.get(year, 0) + 1
+        profile.save(update_fields=PROFILE_FIELDS)
+
+
+def get_credit_history(customer, year=None):
+    """Return scoring aggregates for ``customer``, served from the cache."""
+    year = year or datetime.now().year
+    profile = get_credit_profile(customer.pk)
+    if profile is None:
+        # Build from, and read back from, the primary even when the caller
+        # reads from a replica that has not seen the new profile yet.
+        with primary_reads():
+            rebuild_credit_profiles([customer.pk])
+            profile = get_credit_profile(customer.pk)
+    return profile.history(year)
+
+
+async def aget_credit_history(customer, year=None):
+    """Async ``get_credit_history`` for the ASGI views."""
+    year = year or datetime.now().year
+    profile = await aget_credit_profile(customer.pk)
+    if profile is None:
+        with primary_reads():
+            await sync_to_async(rebuild_credit_profiles)([customer.pk])
+            profile = await aget_credit_profile(customer.pk)
+    return profile.history(year)
+
+
+def lock_credit_history(customer_id, year=None):
+    """Return scoring aggregates read under a row lock on the profile.
+
+    Must run inside a transaction. Bypasses the cache, so the result
+    reflects every loan committed before the lock was granted.
+    """
+    year = year or datetime.now().year
+    profiles = CustomerCreditProfile.objects.select_for_update()
+    profile = profiles.filter(customer_id=customer_id).first()
+    if profile is None:
+        rebuild_credit_profiles([customer_id])
+        profile = profiles.get(customer_id=customer_id)
+    return profile.history(year)
+
+
+def get_credit_histories(customer_ids, year=None):
+    """Return ``{customer_id: history}`` for many customers in bulk.
+
+    Costs one query for the stored profiles plus a constant number of
+    queries to build any profiles that are still missing.
+    """
+    year = year or datetime.now().year
+    profiles = CustomerCreditProfile.objects.in_bulk(customer_ids)
+    missing = [
+        customer_id for customer_id in customer_ids if customer_id not in profiles
+    ]
+    if missing:
+        # As in get_credit_history, read the new profiles back from the
+        # primary in case the caller reads from a lagging replica.
+        with primary_reads():
+            rebuild_credit_profiles(missing)
+            profiles.update(CustomerCreditProfile.objects.in_bulk(missing))
+    return {
+        customer_id: profile.history(year) for customer_id, profile in profiles.items()
+    }
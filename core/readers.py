@@ -0,0 +1,104 @@
+import os
+from itertools import islice
+
+import pandas as pd
+from openpyxl import load_workbook
+
+EXCEL_EXTENSIONS = {".xlsx", ".xlsm"}
+
+
+def _extension(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def _frame(rows, columns, position):
+    """Build a chunk whose index is the absolute data-row number."""
+    return pd.DataFrame(
+        rows, columns=columns, index=range(position, position + len(rows))
+    )
+
+
+def _iter_excel(path, chunk_size, start, stop):
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = list(next(rows, ()))
+        # Like pd.read_excel, ignore blank rows left behind by formatting.
+        rows = (row for row in rows if any(value is not None for value in row))
+        rows = islice(rows, start, stop)
+        position = start
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield _frame(chunk, columns, position)
+            position += len(chunk)
+    finally:
+        workbook.close()
+
+
+def _select_rows(chunks, start, stop):
+    """Index ``chunks`` by data-row number and keep rows ``start:stop``."""
+    position = 0
+    for chunk in chunks:
+        chunk.index = range(position, position + len(chunk))
+        position += len(chunk)
+        chunk = chunk.loc[start : None if stop is None else stop - 1]
+        if len(chunk):
+            yield chunk
+        if stop is not None and position >= stop:
+            break
+
+
+def _iter_csv(path, chunk_size, start, stop):
+    # skiprows and nrows count raw lines, but blank lines are dropped from
+    # the parsed rows, so select the range by parsed row position instead.
+    with pd.read_csv(path, chunksize=chunk_size) as reader:
+        yield from _select_rows(reader, start, stop)
+
+
+def _iter_parquet(path, chunk_size, start, stop):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires pyarrow") from e
+
+    batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+    return _select_rows((batch.to_pandas() for batch in batches), start, stop)
+
+
+def iter_sheet_chunks(path, chunk_size, start=0, stop=None):
+    """Yield DataFrames of at most ``chunk_size`` data rows from ``path``.
+
+    Only one chunk is held in memory at a time. ``start``/``stop`` select
+    a half-open range of data rows (the header row is not counted), and
+    each chunk is indexed by absolute row number so errors can be
+    reported against the original sheet. Excel, CSV and Parquet inputs
+    are supported.
+    """
+    extension = _extension(path)
+    if extension in EXCEL_EXTENSIONS:
+        return _iter_excel(path, chunk_size, start, stop)
+    if extension == ".csv":
+        return _iter_csv(path, chunk_size, start, stop)
+    if extension == ".parquet":
+        return _iter_parquet(path, chunk_size, start, stop)
+    raise ValueError(f"Unsupported import file type: {extension}")
+
+
+def read_sheet_columns(path):
+    """Return the column names of ``path`` without loading its rows."""
+    extension = _extension(path)
+    if extension in EXCEL_EXTENSIONS:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            return list(next(workbook.active.iter_rows(values_only=True), ()))
+        finally:
+            workbook.close()
+    if extension == ".csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    raise ValueError(f"Unsupported import file type: {extension}")
@@ -0,0 +1,77 @@
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: only needed when USE_ORJSON is enabled.
+    orjson = None
+
+
+def ndjson_line(item):
+    """Encode ``item`` as one newline-terminated JSON line."""
+    return (json.dumps(item, cls=JSONEncoder) + "\n").encode()
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON: one line per list item, or one line total."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return b"".join(ndjson_line(item) for item in items)
+
+
+def _require_orjson():
+    if orjson is None:
+        raise ImproperlyConfigured("USE_ORJSON requires the orjson package")
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in replacement for DRF's JSONRenderer built on orjson.
+
+    Produces the same compact UTF-8 output. Floats, ints and strings are
+    encoded natively. Dates and datetimes, like anything else orjson does
+    not handle itself (Decimal, lazy strings, querysets...), go through
+    DRF's encoder, so timestamps keep DRF's millisecond "Z" format and
+    the bytes match JSONRenderer.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def __init__(self):
+        _require_orjson()
+        self.encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return orjson.dumps(
+            data,
+            default=self.encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+
+class ORJSONParser(BaseParser):
+    """Parse JSON request bodies with orjson."""
+
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        _require_orjson()
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f"JSON parse error - {e}")
@@ -0,0 +1,228 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Case, CharField, Count, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Cast, TruncMonth
+
+from .models import JobRun, Loan, LoanRollup
+
+JOB_NAME = "refresh_loan_rollups"
+
+# IDs are handed out before the inserting transaction commits, so a run can
+# see loan N + 1 while loan N is still in flight. Missing IDs are retried
+# by later runs for this long, which should outlast any transaction; after
+# that they are taken to be rolled back or deleted.
+LATE_COMMIT_WINDOW = timedelta(hours=1)
+# A full refresh looks for in-flight IDs only among the newest ones.
+LATE_COMMIT_TAIL_IDS = 10_000
+
+# (label, lower bound) pairs; each band runs up to the next lower bound.
+RATE_BANDS = [
+    ("<8%", None),
+    ("8-10%", 8),
+    ("10-12%", 10),
+    ("12-14%", 12),
+    ("14-16%", 14),
+    ("16%+", 16),
+]
+AGE_BANDS = [
+    ("<25", None),
+    ("25-34", 25),
+    ("35-44", 35),
+    ("45-54", 45),
+    ("55+", 55),
+]
+
+
+def _band(field, bands):
+    """CASE expression labelling ``field`` with its band."""
+    whens = [
+        When(**{f"{field}__gte": lower}, then=Value(label))
+        for label, lower in reversed(bands)
+        if lower is not None
+    ]
+    return Case(*whens, default=Value(bands[0][0]), output_field=CharField())
+
+
+def _band_sort_key(bands):
+    order = {label: position for position, (label, _) in enumerate(bands)}
+    return order.__getitem__
+
+
+DIMENSIONS = {
+    "month": (
+        lambda: TruncMonth("start_date"),
+        lambda month: month.year * 100 + month.month,
+    ),
+    "rate_band": (
+        lambda: _band("interest_rate", RATE_BANDS),
+        _band_sort_key(RATE_BANDS),
+    ),
+    "tenure": (lambda: Cast("tenure", CharField()), int),
+    "age_band": (lambda: _band("customer__age", AGE_BANDS), _band_sort_key(AGE_BANDS)),
+}
+
+AGGREGATES = {
+    "loan_count": Count("pk"),
+    "total_amount": Sum("loan_amount"),
+    "total_monthly_payment": Sum("monthly_payment"),
+    "total_tenure": Sum("tenure"),
+    "weighted_rate": Sum(F("interest_rate") * F("loan_amount")),
+}
+ROLLUP_FIELDS = list(AGGREGATES)
+
+
+def _bucket_label(dimension, value):
+    return value.strftime("%Y-%m") if dimension == "month" else value
+
+
+def _aggregate(loans):
+    """Yield a LoanRollup per dimension bucket of the ``loans`` queryset."""
+    for dimension, (expression, sort_key) in DIMENSIONS.items():
+        rows = loans.order_by().values(bucket=expression()).annotate(**AGGREGATES)
+        for row in rows:
+            yield LoanRollup(
+                dimension=dimension,
+                bucket=_bucket_label(dimension, row["bucket"]),
+                sort_key=sort_key(row["bucket"]),
+                **{field: row[field] or 0 for field in ROLLUP_FIELDS},
+            )
+
+
+def _loans_counted(rollups):
+    # Every loan falls in exactly one month bucket.
+    return sum(rollup.loan_count for rollup in rollups if rollup.dimension == "month")
+
+
+def _id_ranges(ranges):
+    return Q(
+        *[Q(loan_id__gte=first, loan_id__lte=last) for first, last, _ in ranges],
+        _connector=Q.OR,
+    )
+
+
+def _missing_ranges(ranges, present_ids):
+    """Sub-ranges of the sorted, disjoint ``ranges`` with no ``present_ids``.
+
+    ``present_ids`` must be sorted and fall inside ``ranges``; each missing
+    range keeps the seen_at of the range it was cut from.
+    """
+    present_ids = iter(present_ids)
+    next_id = next(present_ids, None)
+    missing = []
+    for first, last, seen_at in ranges:
+        expected = first
+        while next_id is not None and next_id <= last:
+            if next_id > expected:
+                missing.append([expected, next_id - 1, seen_at])
+            expected = next_id + 1
+            next_id = next(present_ids, None)
+        if expected <= last:
+            missing.append([expected, last, seen_at])
+    return missing
+
+
+def _committed(run, loans, ranges):
+    """Narrow ``loans`` to IDs in ``ranges`` that have already committed.
+
+    The IDs are read before the caller aggregates, and the ranges found
+    missing are excluded from ``loans``. A loan committing in between is
+    then neither counted now nor lost, because its range is left in
+    ``run.pending_ids`` for the next run.
+    """
+    present = (
+        Loan.objects.filter(_id_ranges(ranges))
+        .order_by("loan_id")
+        .values_list("loan_id", flat=True)
+    )
+    run.pending_ids = _missing_ranges(ranges, present.iterator())
+    if run.pending_ids:
+        loans = loans.exclude(_id_ranges(run.pending_ids))
+    return loans
+
+
+def _lock():
+    """Serialize refreshes so two runs never add the same loans twice."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [JOB_NAME])
+
+
+def refresh_rollups(run):
+    """Bring LoanRollup up to date and return the number of loans folded in.
+
+    Incremental runs add loans with IDs above the previous run's high
+    water mark, plus those in ID ranges earlier runs found uncommitted
+    (``JobRun.pending_ids``), with one grouped query per dimension.
+    Updated or deleted loans are only picked up by a full refresh
+    (``run.full``), which rebuilds every bucket from scratch and runs after
+    each spreadsheet import.
+    """
+    with transaction.atomic():
+        _lock()
+        previous = (
+            JobRun.objects.filter(job=JOB_NAME, finished_at__isnull=False)
+            .exclude(pk=run.pk)
+            .order_by("-pk")
+            .first()
+        )
+        if previous is None or previous.high_water_id is None:
+            run.full = True
+        high_water_id = Loan.objects.aggregate(top=Max("loan_id"))["top"] or 0
+        run.high_water_id = high_water_id
+        seen_at = run.started_at.timestamp()
+
+        if run.full:
+            loans = Loan.objects.filter(loan_id__lte=high_water_id)
+            run.pending_ids = []
+            if high_water_id:
+                tail_start = max(high_water_id - LATE_COMMIT_TAIL_IDS, 0) + 1
+                loans = _committed(run, loans, [[tail_start, high_water_id, seen_at]])
+            rollups = list(_aggregate(loans))
+            LoanRollup.objects.all().delete()
+            LoanRollup.objects.bulk_create(rollups, batch_size=1000)
+            return _loans_counted(rollups)
+
+        cutoff = (run.started_at - LATE_COMMIT_WINDOW).timestamp()
+        ranges = [pending for pending in previous.pending_ids if pending[2] >= cutoff]
+        if high_water_id > previous.high_water_id:
+            ranges.append([previous.high_water_id + 1, high_water_id, seen_at])
+        if not ranges:
+            run.pending_ids = []
+            return 0
+        loans = _committed(run, Loan.objects.filter(_id_ranges(ranges)), ranges)
+        deltas = list(_aggregate(loans))
+        if not deltas:
+            return 0
+        folded = _loans_counted(deltas)
+        existing = {
+            (rollup.dimension, rollup.bucket): rollup
+            for rollup in LoanRollup.objects.filter(
+                dimension__in={delta.dimension for delta in deltas},
+                bucket__in={delta.bucket for delta in deltas},
+            )
+        }
+        for delta in deltas:
+            current = existing.get((delta.dimension, delta.bucket))
+            if current is not None:
+                for field in ROLLUP_FIELDS:
+                    setattr(
+                        delta, field, getattr(delta, field) + getattr(current, field)
+                    )
+        LoanRollup.objects.bulk_create(
+            deltas,
+            update_conflicts=True,
+            unique_fields=["dimension", "bucket"],
+            update_fields=["sort_key", *ROLLUP_FIELDS],
+        )
+        return folded
+
+
+def last_refresh():
+    """Finish time of the latest rollup refresh, or None before the first."""
+    return (
+        JobRun.objects.filter(job=JOB_NAME, finished_at__isnull=False)
+        .order_by("-finished_at")
+        .values_list("finished_at", flat=True)
+        .first()
+    )
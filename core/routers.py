@@ -0,0 +1,128 @@
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DB_ALIAS = "replica"
+
+# Alias that reads in the current request or task should use; None keeps
+# Django's default routing to the primary.
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def _recent_write_key(customer_id):
+    return f"recent_write:{customer_id}"
+
+
+def mark_recent_write(customer_id):
+    """Pin ``customer_id``'s reads to the primary for the read-your-writes window.
+
+    The window should exceed the replica's usual lag, so the customer sees
+    their own new loan and the cache is never refilled from a replica that
+    has not caught up yet.
+    """
+    if not replica_configured():
+        return
+    try:
+        cache.set(
+            _recent_write_key(customer_id),
+            True,
+            timeout=settings.READ_YOUR_WRITES_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"Could not record recent write for {customer_id}: {e}")
+
+
+def wrote_recently(*customer_ids):
+    """Whether any of ``customer_ids`` is inside its read-your-writes window."""
+    try:
+        return bool(cache.get_many(map(_recent_write_key, customer_ids)))
+    except Exception:
+        # Without the marker we cannot rule out a recent write.
+        return True
+
+
+async def awrote_recently(*customer_ids):
+    """Async ``wrote_recently`` for the ASGI views."""
+    try:
+        return bool(await cache.aget_many(map(_recent_write_key, customer_ids)))
+    except Exception:
+        return True
+
+
+def reading_from_replica():
+    """True inside a ``replica_reads`` block that actually uses the replica."""
+    return _read_alias.get() == REPLICA_DB_ALIAS
+
+
+@contextmanager
+def replica_reads(*customer_ids):
+    """Send reads in this block to the replica.
+
+    Falls back to the primary when no replica is configured or when any
+    of ``customer_ids`` is inside its read-your-writes window.
+    """
+    use_replica = replica_configured() and not (
+        customer_ids and wrote_recently(*customer_ids)
+    )
+    token = _read_alias.set(REPLICA_DB_ALIAS if use_replica else None)
+    try:
+        yield use_replica
+    finally:
+        _read_alias.reset(token)
+
+
+@asynccontextmanager
+async def areplica_reads(*customer_ids):
+    """Async ``replica_reads`` that checks the write markers without blocking."""
+    use_replica = replica_configured() and not (
+        customer_ids and await awrote_recently(*customer_ids)
+    )
+    token = _read_alias.set(REPLICA_DB_ALIAS if use_replica else None)
+    try:
+        yield use_replica
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Send reads in this block to the primary, e.g. to retry a replica miss."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Route reads inside ``replica_reads`` blocks to the replica.
+
+    Everything else, including every write and any read made inside a
+    transaction on the primary, stays on the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica mirrors the primary, so objects from either relate.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
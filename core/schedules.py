@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.utils import timezone
+
+from .amortization import packed_schedules
+from .models import Loan, LoanSchedule
+
+SCHEDULE_COLUMNS = [
+    "loan_id",
+    "loan_amount",
+    "monthly_payment",
+    "interest_rate",
+    "tenure",
+]
+
+
+def store_schedules(rows):
+    """Build and save schedules for ``rows`` of SCHEDULE_COLUMNS values.
+
+    Existing schedules for the same loans are replaced. Returns the
+    packed schedules in row order.
+    """
+    if not rows:
+        return []
+    loan_ids, loan_amounts, monthly_payments, interest_rates, tenures = zip(*rows)
+    packed = packed_schedules(loan_amounts, monthly_payments, interest_rates, tenures)
+    now = timezone.now()
+    LoanSchedule.objects.bulk_create(
+        [
+            LoanSchedule(loan_id=loan_id, data=data, generated_at=now)
+            for loan_id, data in zip(loan_ids, packed)
+        ],
+        update_conflicts=True,
+        unique_fields=["loan"],
+        update_fields=["data", "generated_at"],
+    )
+    return packed
+
+
+def build_schedules(rebuild=False, batch_size=None):
+    """Store schedules for every loan without one, or for all loans.
+
+    Loans are walked in primary key order, ``batch_size`` at a time, and
+    each batch is amortized and written in one go. Returns the number of
+    schedules built.
+    """
+    batch_size = batch_size or settings.SCHEDULE_BATCH_SIZE
+    loans = Loan.objects.order_by("loan_id")
+    if not rebuild:
+        loans = loans.filter(schedule__isnull=True)
+    built, last_id = 0, 0
+    while True:
+        rows = list(
+            loans.filter(loan_id__gt=last_id).values_list(*SCHEDULE_COLUMNS)[
+                :batch_size
+            ]
+        )
+        if not rows:
+            return built
+        store_schedules(rows)
+        built += len(rows)
+        last_id = rows[-1][0]
+
+
+def get_schedule_data(loan):
+    """Return the packed schedule for a ``get_loan`` row, building it if missing."""
+    data = (
+        LoanSchedule.objects.filter(loan_id=loan["loan_id"])
+        .values_list("data", flat=True)
+        .first()
+    )
+    if data is not None:
+        return data
+    (data,) = store_schedules([tuple(loan[column] for column in SCHEDULE_COLUMNS)])
+    return data
@@ -0,0 +1,72 @@
+import numpy as np
+
+from .amortization import annuity_factors
+
+
+def score_loan_applications(
+    *,
+    approved_limit,
+    monthly_salary,
+    current_debt,
+    loan_count,
+    total_loan_volume,
+    total_emis,
+    emis_paid_on_time,
+    total_tenure,
+    current_year_loans,
+    loan_amount,
+    interest_rate,
+    tenure,
+):
+    """Vectorized ``score_loan_application`` over columnar inputs.
+
+    Every argument is an array (or scalar broadcast to the batch) holding
+    one value per application. Returns a dict of arrays with the same
+    keys as the scalar function and results that match it exactly,
+    operation for operation.
+    """
+    approved_limit = np.asarray(approved_limit, dtype=float)
+    monthly_salary = np.asarray(monthly_salary, dtype=float)
+    current_debt = np.asarray(current_debt, dtype=float)
+    loan_count = np.asarray(loan_count, dtype=np.int64)
+    total_loan_volume = np.asarray(total_loan_volume, dtype=float)
+    total_emis = np.asarray(total_emis, dtype=float)
+    emis_paid_on_time = np.asarray(emis_paid_on_time, dtype=float)
+    total_tenure = np.asarray(total_tenure, dtype=float)
+    current_year_loans = np.asarray(current_year_loans, dtype=np.int64)
+    size = np.broadcast(
+        approved_limit, loan_count, np.asarray(loan_amount), np.asarray(tenure)
+    ).size
+    loan_amount = np.broadcast_to(np.asarray(loan_amount, dtype=float), size)
+    interest_rate = np.broadcast_to(np.asarray(interest_rate, dtype=float), size)
+    tenure = np.broadcast_to(np.asarray(tenure, dtype=np.int64), size)
+
+    has_loans = loan_count > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        on_time_ratio = np.where(has_loans, emis_paid_on_time / total_tenure, 0.0)
+    score = np.where(has_loans, np.minimum(25, on_time_ratio * 25), 10.0)
+    score = score + np.maximum(0, 20 - loan_count * 2)
+    score = score + np.maximum(0, 20 - current_year_loans * 5)
+    score = score + np.maximum(0, 20 - (total_loan_volume / approved_limit) * 20)
+    score = np.where(current_debt > approved_limit, 0.0, score)
+
+    approval = (score > 50) | ((score > 30) & (interest_rate >= 12))
+    approval |= (score > 10) & (interest_rate >= 16)
+
+    corrected_rate = np.select(
+        [score <= 10, score <= 30, score <= 50],
+        [16.0, np.maximum(interest_rate, 16), np.maximum(interest_rate, 12)],
+        default=interest_rate,
+    )
+
+    emi = loan_amount * annuity_factors(corrected_rate, tenure)
+
+    approval &= ~(emi + total_emis > 0.5 * monthly_salary)
+
+    return {
+        "score": score,
+        "approval": approval,
+        "corrected_interest_rate": corrected_rate,
+        # Python's round() is correctly rounded; np.round is not always.
+        "monthly_installment": np.array([round(value, 2) for value in emi.tolist()]),
+    }
@@ -1,5 +1,8 @@
+from django.db import models
+
+from .amortization import unpack_schedule
 from rest_framework import serializers
-from .models import Customer, Loan
+from .models import Customer
 
 
 class CustomerSerializer(serializers.ModelSerializer):
@@ -8,9 +11,122 @@ class CustomerSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class LoanSerializer(serializers.ModelSerializer):
-    customer = CustomerSerializer(read_only=True)
+# Hot endpoints build their response dicts directly from model attributes
+# or ``.values()`` rows instead of instantiating DRF serializers, whose
+# field introspection and per-field dispatch cost far more than the data.
 
-    class Meta:
-        model = Loan
-        fields = "__all__"
+
+def _to_representation(field):
+    """Return the conversion DRF's ModelSerializer applies to ``field``."""
+    if isinstance(field, models.FloatField):
+        return float
+    if isinstance(field, models.IntegerField):
+        return int
+    if isinstance(field, models.CharField):
+        return str
+    if isinstance(field, models.DateField):
+        return lambda value: value.isoformat()
+    return lambda value: value
+
+
+# (attribute name, converter) for every Customer column, computed once.
+CUSTOMER_FIELD_MAP = [
+    (field.attname, _to_representation(field))
+    for field in Customer._meta.concrete_fields
+]
+
+
+def customer_data(customer):
+    """Serialize ``customer`` exactly like ``CustomerSerializer(customer).data``."""
+    data = {}
+    for attname, convert in CUSTOMER_FIELD_MAP:
+        value = getattr(customer, attname)
+        data[attname] = None if value is None else convert(value)
+    return data
+
+
+def loan_detail_data(loan, customer):
+    """Format a ``get_loan`` row and its customer for the loan detail view."""
+    is_approved = True
+    return {
+        "loan_id": loan["loan_id"],
+        "customer": {
+            "customer_id": customer.customer_id,
+            "first_name": customer.first_name,
+            "last_name": customer.last_name,
+            "phone_number": customer.phone_number,
+            "age": customer.age,
+        },
+        "loan_approved": is_approved,
+        "loan_amount": loan["loan_amount"],
+        "interest_rate": loan["interest_rate"],
+        "monthly_installment": loan["monthly_payment"],
+        "tenure": loan["tenure"],
+    }
+
+
+def customer_loan_item(
+    loan_id, loan_amount, interest_rate, monthly_payment, tenure, emis_paid_on_time
+):
+    """Format one ``customer_loan_rows`` tuple for the loan list."""
+    return {
+        "loan_id": loan_id,
+        "loan_amount": loan_amount,
+        "interest_rate": interest_rate,
+        "monthly_installment": monthly_payment,
+        "repayments_left": tenure - emis_paid_on_time,
+    }
+
+
+def loan_schedule_data(loan, data):
+    """Format a ``get_loan`` row and its packed schedule."""
+    principal, interest, balance = (
+        [round(value, 2) for value in values.tolist()]
+        for values in unpack_schedule(data)
+    )
+    paid = min(max(loan["emis_paid_on_time"], 0), loan["tenure"])
+    return {
+        "loan_id": loan["loan_id"],
+        "loan_amount": loan["loan_amount"],
+        "interest_rate": loan["interest_rate"],
+        "monthly_installment": loan["monthly_payment"],
+        "tenure": loan["tenure"],
+        "repayments_left": loan["tenure"] - loan["emis_paid_on_time"],
+        "outstanding_balance": balance[paid - 1] if paid else loan["loan_amount"],
+        "schedule": [
+            {
+                "installment": number,
+                "principal": principal[number - 1],
+                "interest": interest[number - 1],
+                "balance": balance[number - 1],
+            }
+            for number in range(1, len(balance) + 1)
+        ],
+    }
+
+
+ROLLUP_COLUMNS = [
+    "bucket",
+    "loan_count",
+    "total_amount",
+    "total_monthly_payment",
+    "total_tenure",
+    "weighted_rate",
+]
+
+
+def rollup_item(
+    bucket, loan_count, total_amount, total_monthly_payment, total_tenure, weighted_rate
+):
+    """Format one ``ROLLUP_COLUMNS`` tuple of a LoanRollup."""
+    return {
+        "bucket": bucket,
+        "loan_count": loan_count,
+        "total_amount": round(total_amount, 2),
+        "average_amount": round(total_amount / loan_count, 2) if loan_count else 0,
+        "average_interest_rate": (
+            round(weighted_rate / total_amount, 2) if total_amount else 0
+        ),
+        "total_monthly_payment": round(total_monthly_payment, 2),
+        "average_tenure": round(total_tenure / loan_count, 2) if loan_count else 0,
+    }
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_customer, invalidate_loan
+from .models import Customer, Loan, LoanSchedule
+from .profiles import (
+    rebuild_credit_profiles,
+    rebuild_credit_profiles_on_commit,
+    record_loan,
+)
+from .routers import mark_recent_write
+
+
+@receiver(post_save, sender=Loan)
+def update_profile_on_loan_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_loan(instance)
+    else:
+        rebuild_credit_profiles([instance.customer_id])
+        # Rebuilt from the new terms on the next schedule request.
+        LoanSchedule.objects.filter(loan_id=instance.loan_id).delete()
+    invalidate_loan(instance)
+    mark_recent_write(instance.customer_id)
+
+
+@receiver(post_delete, sender=Loan)
+def update_profile_on_loan_delete(sender, instance, **kwargs):
+    rebuild_credit_profiles_on_commit(instance.customer_id)
+    invalidate_loan(instance)
+    mark_recent_write(instance.customer_id)
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_customer_cache(sender, instance, **kwargs):
+    invalidate_customer(instance.customer_id)
+    mark_recent_write(instance.customer_id)
@@ -1,9 +1,95 @@
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
 from django.urls import reverse
-from core.models import Customer, Loan
-from datetime import date, datetime
+from core import async_views, tasks
+from core.models import (
+    Customer,
+    CustomerCreditProfile,
+    ImportCheckpoint,
+    JobRun,
+    Loan,
+    LoanRollup,
+    LoanSchedule,
+    PortfolioScore,
+    PortfolioScoreRun,
+)
+from core.amortization import (
+    amortization_schedules,
+    annuity_factor,
+    annuity_factors,
+    packed_schedules,
+    unpack_schedule,
+)
+from core.cache import customer_loan_rows, get_customer, get_loan
+from core.exports import iter_batches, loan_partition_path
+from core.management.commands.bench_endpoints import (
+    build_requests,
+    run_requests,
+    seed_dataset,
+)
+from core.management.commands.bench_json import loan_payload
+from core.metrics import DatabasePoolCollector
+from core.middleware import AsyncWhiteNoiseMiddleware, QueryBudgetExceeded
+from core.renderers import ORJSONParser, ORJSONRenderer
+from core.routers import (
+    ReplicaRouter,
+    mark_recent_write,
+    primary_reads,
+    reading_from_replica,
+    replica_reads,
+    wrote_recently,
+)
+from core.profiles import get_credit_history, rebuild_credit_profiles
+from core.readers import iter_sheet_chunks
+from core.scoring import score_loan_applications
+from core.serializers import CustomerSerializer, customer_data
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+import json
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
 from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from opentelemetry.sdk.trace import TracerProvider
+from prometheus_client import REGISTRY
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.http import JsonResponse
+from django.test import AsyncRequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from core.tasks import (
+    build_loan_schedules,
+    export_parquet,
+    recompute_current_debt,
+    refresh_loan_rollups,
+    dispatch_sharded_import,
+    import_customer_data,
+    import_loan_data,
+    partition_loan_file,
+    plan_import_shards,
+)
+from credit_system.celery import app as celery_app
+from core.utils import (
+    aggregate_loan_history,
+    evaluate_loan_eligibility,
+    score_loan_application,
+)
 
 
 class LoanAPITestCase(APITestCase):
@@ -579,3 +665,1989 @@ class LoanAPITestCase(APITestCase):
         self.assertIn(
             response2.status_code, [status.HTTP_200_OK, status.HTTP_201_CREATED]
         )
+
+
+class LoanHistoryAggregateTestCase(APITestCase):
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Carol",
+            last_name="Diaz",
+            age=40,
+            phone_number="3141592653",
+            monthly_salary=80000,
+            approved_limit=2900000,
+            current_debt=0,
+        )
+        for year, paid in [(2022, 12), (2023, 6), (datetime.now().year, 0)]:
+            Loan.objects.create(
+                customer=self.customer,
+                loan_amount=200000,
+                tenure=24,
+                interest_rate=11,
+                monthly_payment=9321,
+                emis_paid_on_time=paid,
+                start_date=date(year, 3, 1),
+                end_date=date(year + 2, 3, 1),
+            )
+
+    def test_aggregate_uses_single_query(self):
+        """All scoring inputs come back from one aggregate query"""
+        with self.assertNumQueries(1):
+            history = aggregate_loan_history(
+                Loan.objects.filter(customer=self.customer)
+            )
+
+        self.assertEqual(history["loan_count"], 3)
+        self.assertEqual(history["total_loan_volume"], 600000)
+        self.assertEqual(history["total_emis"], 3 * 9321)
+        self.assertEqual(history["emis_paid_on_time"], 18)
+        self.assertEqual(history["total_tenure"], 72)
+        self.assertEqual(history["current_year_loans"], 1)
+
+    def test_aggregate_empty_history_is_zero(self):
+        """Customers without loans get zeroed aggregates instead of NULLs"""
+        history = aggregate_loan_history(Loan.objects.none())
+        self.assertTrue(all(value == 0 for value in history.values()))
+
+    def test_current_year_range_boundaries(self):
+        """Loans on the first and last day count; neighbouring years do not"""
+        for start in [date(2020, 12, 31), date(2021, 1, 1), date(2021, 12, 31)]:
+            Loan.objects.create(
+                customer=self.customer,
+                loan_amount=1000,
+                tenure=1,
+                interest_rate=10,
+                monthly_payment=1008,
+                emis_paid_on_time=1,
+                start_date=start,
+                end_date=start,
+            )
+        history = aggregate_loan_history(
+            Loan.objects.filter(customer=self.customer), year=2021
+        )
+        self.assertEqual(history["current_year_loans"], 2)
+
+    def test_evaluate_matches_row_by_row_scoring(self):
+        """The aggregate path scores exactly like summing loan rows"""
+        loans = list(Loan.objects.filter(customer=self.customer))
+        history = {
+            "loan_count": len(loans),
+            "total_loan_volume": sum(loan.loan_amount for loan in loans),
+            "total_emis": sum(loan.monthly_payment for loan in loans),
+            "emis_paid_on_time": sum(loan.emis_paid_on_time for loan in loans),
+            "total_tenure": sum(loan.tenure for loan in loans),
+            "current_year_loans": 1,
+        }
+
+        with self.assertNumQueries(1):
+            result = evaluate_loan_eligibility(
+                self.customer,
+                150000,
+                13,
+                18,
+                Loan.objects.filter(customer=self.customer),
+            )
+
+        self.assertEqual(
+            result, score_loan_application(self.customer, 150000, 13, 18, history)
+        )
+
+
+class CustomerCreditProfileTestCase(APITestCase):
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Dana",
+            last_name="Ito",
+            age=33,
+            phone_number="2718281828",
+            monthly_salary=70000,
+            approved_limit=2500000,
+            current_debt=0,
+        )
+        for paid in (10, 4):
+            Loan.objects.create(
+                customer=self.customer,
+                loan_amount=120000,
+                tenure=12,
+                interest_rate=12,
+                monthly_payment=10662,
+                emis_paid_on_time=paid,
+                start_date=date(2023, 5, 1),
+                end_date=date(2024, 5, 1),
+            )
+
+    def assertProfileMatchesLoans(self):
+        expected = aggregate_loan_history(
+            Loan.objects.filter(customer=self.customer), year=2023
+        )
+        profile = CustomerCreditProfile.objects.get(customer=self.customer)
+        self.assertEqual(profile.history(2023), expected)
+
+    def test_profile_tracks_created_loans(self):
+        """Creating loans keeps the materialized profile in sync"""
+        self.assertProfileMatchesLoans()
+
+    def test_profile_tracks_updated_and_deleted_loans(self):
+        """Updating or deleting a loan refreshes the profile"""
+        loan = Loan.objects.filter(customer=self.customer).first()
+        loan.emis_paid_on_time = 12
+        loan.save()
+        self.assertProfileMatchesLoans()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            loan.delete()
+        self.assertProfileMatchesLoans()
+
+    def test_deleting_customer_with_loans(self):
+        """A customer cascade skips the profile rebuild and runs it only once"""
+        customer_id = self.customer.pk
+        with patch(
+            "core.profiles.rebuild_credit_profiles", wraps=rebuild_credit_profiles
+        ) as rebuild, self.captureOnCommitCallbacks(execute=True):
+            self.customer.delete()
+        rebuild.assert_called_once()
+        self.assertFalse(
+            CustomerCreditProfile.objects.filter(customer_id=customer_id).exists()
+        )
+        connection.check_constraints()
+
+    def test_create_loan_endpoint_updates_profile(self):
+        """Loans created through the API are folded into the profile"""
+        response = self.client.post(
+            "/create-loan/",
+            {
+                "customer_id": self.customer.customer_id,
+                "loan_amount": "20000",
+                "interest_rate": "14",
+                "tenure": "12",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        profile = CustomerCreditProfile.objects.get(customer=self.customer)
+        self.assertEqual(profile.loan_count, 3)
+        self.assertEqual(profile.loans_per_year[str(date.today().year)], 1)
+
+    def test_eligibility_reads_profile_not_loans(self):
+        """Scoring is a customer lookup plus a profile primary-key lookup"""
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                "/check-eligibility/",
+                {
+                    "customer_id": self.customer.customer_id,
+                    "loan_amount": 50000,
+                    "interest_rate": 12,
+                    "tenure": 12,
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_rebuild_command_restores_profiles(self):
+        """The management command rebuilds profiles from scratch"""
+        CustomerCreditProfile.objects.all().delete()
+        call_command("rebuild_credit_profiles", stdout=StringIO())
+        self.assertProfileMatchesLoans()
+
+
+class SheetFileMixin:
+    """Write test sheets to a temporary directory for the import tasks."""
+
+    def write_sheet(self, df, name):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        if name.endswith(".csv"):
+            df.to_csv(path, index=False)
+        else:
+            df.to_excel(path, index=False)
+        return path
+
+
+class CustomerImportTestCase(SheetFileMixin, APITestCase):
+
+    def setUp(self):
+        Customer.objects.create(
+            first_name="Existing",
+            last_name="Customer",
+            age=50,
+            phone_number="9000000001",
+            monthly_salary=40000,
+            approved_limit=1400000,
+            current_debt=0,
+        )
+        self.sheet = pd.DataFrame(
+            {
+                "Customer ID": [101, 102, 103, 104, 105],
+                "First Name": ["Ann", "Ben", "Cid", "Dee", "Eve"],
+                "Last Name": ["A", "B", "C", "D", "E"],
+                "Age": [30, 41, 29, "unknown", 35],
+                "Phone Number": [
+                    9000000002,
+                    9000000001,  # already registered
+                    9000000002,  # duplicate within the sheet
+                    9000000004,
+                    9000000005,
+                ],
+                "Monthly Salary": [50000, 60000, 70000, 80000, 90000],
+                "Approved Limit": [1800000, 2200000, 2500000, 2900000, 3200000],
+            }
+        )
+
+    def test_bulk_import_reports_row_errors(self):
+        """Bulk import inserts valid rows and counts each rejected row"""
+        path = self.write_sheet(self.sheet, "customer_data.xlsx")
+
+        result = import_customer_data(path)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(result["errors"], 3)
+        self.assertIn("rows_per_second", result)
+        self.assertEqual(result["total_customers"], 3)
+        imported = Customer.objects.get(phone_number="9000000005")
+        self.assertEqual(imported.first_name, "Eve")
+        self.assertEqual(imported.monthly_salary, 90000)
+        self.assertEqual(imported.current_debt, 0)
+
+    def test_bulk_import_batches_phone_lookups(self):
+        """Duplicate phone and ID detection runs once per batch, not per row"""
+        path = self.write_sheet(self.sheet, "customer_data.xlsx")
+
+        with self.settings(IMPORT_BATCH_SIZE=2):
+            with CaptureQueriesContext(connection) as queries:
+                import_customer_data(path)
+
+        lookups = [
+            query["sql"]
+            for query in queries.captured_queries
+            if '"core_customer"."phone_number" IN' in query["sql"]
+        ]
+        # three importable rows in batches of two
+        self.assertEqual(len(lookups), 2)
+
+    def test_chunked_import_resumes_after_failure(self):
+        """A failed chunk rolls back alone and the rerun resumes after it"""
+        path = self.write_sheet(self.sheet, "customer_data.csv")
+        real_import_chunk = tasks._import_customer_chunk
+        calls = []
+
+        def fail_on_second_chunk(chunk, use_copy):
+            calls.append(chunk.index[0])
+            if len(calls) == 2:
+                raise RuntimeError("worker lost")
+            return real_import_chunk(chunk, use_copy)
+
+        with self.settings(IMPORT_CHUNK_SIZE=2):
+            with patch.object(
+                tasks, "_import_customer_chunk", side_effect=fail_on_second_chunk
+            ):
+                failed = import_customer_data(path)
+            self.assertFalse(failed["success"])
+            self.assertEqual(Customer.objects.count(), 2)  # first chunk committed
+
+            result = import_customer_data(path)
+
+        self.assertEqual(calls, [0, 2])
+        self.assertTrue(result["success"])
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(result["errors"], 3)
+        self.assertTrue(ImportCheckpoint.objects.get(key=f"customers:{path}").completed)
+
+    def test_csv_row_range_ignores_blank_lines(self):
+        """CSV row ranges count parsed rows, as blank lines are dropped"""
+        path = self.write_sheet(self.sheet, "customer_data.csv")
+        with open(path) as f:
+            header, *rows = f.read().splitlines()
+        with open(path, "w") as f:
+            f.write("\n\n".join([header, *rows]) + "\n")
+
+        chunks = list(iter_sheet_chunks(path, 2, start=1, stop=4))
+
+        rows = pd.concat(chunks)
+        self.assertEqual(list(rows.index), [1, 2, 3])
+        self.assertEqual(list(rows["First Name"]), ["Ben", "Cid", "Dee"])
+
+
+class LoanImportTestCase(SheetFileMixin, APITestCase):
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Fay",
+            last_name="Gupta",
+            age=45,
+            phone_number="9100000001",
+            monthly_salary=90000,
+            approved_limit=3200000,
+            current_debt=0,
+        )
+        Loan.objects.create(
+            loan_id=500,
+            customer=self.customer,
+            loan_amount=100000,
+            tenure=12,
+            interest_rate=10,
+            monthly_payment=8792,
+            emis_paid_on_time=12,
+            start_date=date(2020, 1, 1),
+            end_date=date(2021, 1, 1),
+        )
+        cid = self.customer.customer_id
+        self.sheet = pd.DataFrame(
+            {
+                "Customer ID": [cid, cid, 99999, cid, cid, cid],
+                "Loan ID": [501, 500, 502, 503, 501, 504],
+                "Loan Amount": [200000, 1, 1, 300000, 1, 1],
+                "Tenure": [24, 1, 1, 36, 1, 1],
+                "Interest Rate": [11.5, 1, 1, 13.1, 1, 1],
+                "Monthly payment": [9368, 1, 1, 10110, 1, 1],
+                "EMIs paid on Time": [20, 1, 1, 7, 1, 1],
+                "Date of Approval": pd.to_datetime(
+                    ["2021-02-01", "2021-02-01", "2021-02-01", "2022-07-15"]
+                    + ["2021-02-01", None]
+                ),
+                "End Date": pd.to_datetime(
+                    ["2023-02-01", "2021-03-01", "2021-03-01", "2025-07-15"]
+                    + ["2021-03-01", "2021-03-01"]
+                ),
+            }
+        )
+
+    def test_set_based_import_counters(self):
+        """Counters stay accurate for new, existing, duplicate and bad rows"""
+        path = self.write_sheet(self.sheet, "loan_data.xlsx")
+
+        with self.settings(IMPORT_CHUNK_SIZE=4, IMPORT_BATCH_SIZE=2):
+            result = import_loan_data(path)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual(result["skipped"], 2)  # loan 500 and the repeated 501
+        self.assertEqual(result["errors"], 2)  # unknown customer, missing date
+        loan = Loan.objects.get(loan_id=503)
+        self.assertEqual(loan.start_date, date(2022, 7, 15))
+        self.assertEqual(loan.tenure, 36)
+
+        profile = CustomerCreditProfile.objects.get(customer=self.customer)
+        self.assertEqual(profile.loan_count, 3)
+        self.assertEqual(profile.loans_per_year, {"2020": 1, "2021": 1, "2022": 1})
+        self.assertEqual(
+            set(LoanSchedule.objects.values_list("loan_id", flat=True)), {501, 503}
+        )
+
+    @patch("core.routers.replica_configured", return_value=True)
+    def test_import_invalidates_only_touched_customers(self, _):
+        """Imports drop their customers' entries and leave the rest cached"""
+        cid = self.customer.customer_id
+        cache.set(f"customer_loans:{cid}", "stale")
+        cache.set("customer_loans:99998", "unrelated")
+        mark_recent_write(99998)
+
+        import_loan_data(self.write_sheet(self.sheet, "loan_data.xlsx"))
+
+        self.assertIsNone(cache.get(f"customer_loans:{cid}"))
+        self.assertEqual(cache.get("customer_loans:99998"), "unrelated")
+        self.assertTrue(wrote_recently(99998))
+
+    def test_imported_ids_do_not_block_new_loans(self):
+        """Loans created after an import get IDs past the imported ones"""
+        import_loan_data(self.write_sheet(self.sheet, "loan_data.xlsx"))
+
+        response = self.client.post(
+            "/create-loan/",
+            {
+                "customer_id": self.customer.customer_id,
+                "loan_amount": "10000",
+                "interest_rate": "14",
+                "tenure": "12",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(response.data["loan_id"], 503)
+
+    def test_concurrently_inserted_loan_ids_are_not_counted(self):
+        """A loan ID taken by another shard mid-batch is skipped, not imported"""
+        other = Customer.objects.create(
+            first_name="Gil",
+            last_name="Rao",
+            age=38,
+            phone_number="9100000002",
+            monthly_salary=60000,
+            approved_limit=2200000,
+            current_debt=0,
+        )
+        bulk_create = Loan.objects.bulk_create
+
+        def other_shard_first(loans, **kwargs):
+            # Another shard commits loan 503 for its own customer between
+            # this batch's existence check and its insert.
+            bulk_create(
+                [
+                    Loan(
+                        loan_id=503,
+                        customer=other,
+                        loan_amount=50000,
+                        tenure=6,
+                        interest_rate=9,
+                        monthly_payment=8552,
+                        emis_paid_on_time=6,
+                        start_date=date(2022, 1, 1),
+                        end_date=date(2022, 7, 1),
+                    )
+                ]
+            )
+            return bulk_create(loans, **kwargs)
+
+        path = self.write_sheet(self.sheet, "loan_data.xlsx")
+        with patch.object(Loan.objects, "bulk_create", side_effect=other_shard_first):
+            result = import_loan_data(path)
+
+        self.assertEqual(result["imported"], 1)
+        self.assertEqual(result["skipped"], 3)
+        self.assertEqual(Loan.objects.get(loan_id=503).customer, other)
+        self.assertEqual(
+            set(LoanSchedule.objects.values_list("loan_id", flat=True)), {501}
+        )
+        profile = CustomerCreditProfile.objects.get(customer=self.customer)
+        self.assertEqual(profile.loan_count, 2)
+
+
+class ShardedImportTestCase(SheetFileMixin, APITestCase):
+
+    def setUp(self):
+        self.customer_path = self.write_sheet(
+            pd.DataFrame(
+                {
+                    "Customer ID": [1, 2, 3, 4],
+                    "First Name": ["Gil", "Hal", "Ida", "Jon"],
+                    "Last Name": ["G", "H", "I", "J"],
+                    "Age": [31, 42, 53, 64],
+                    "Phone Number": [9200000001, 9200000002, 9200000003, 9200000004],
+                    "Monthly Salary": [50000, 60000, 70000, 80000],
+                    "Approved Limit": [1800000, 2200000, 2500000, 2900000],
+                }
+            ),
+            "customer_data.csv",
+        )
+        self.loan_path = self.write_sheet(
+            pd.DataFrame(
+                {
+                    "Customer ID": [4, 1, 77, 2],
+                    "Loan ID": [11, 12, 13, 14],
+                    "Loan Amount": [100000, 200000, 300000, 400000],
+                    "Tenure": [12, 24, 36, 48],
+                    "Interest Rate": [10.5, 11.5, 12.5, 13.5],
+                    "Monthly payment": [8815, 9368, 10036, 10837],
+                    "EMIs paid on Time": [12, 20, 30, 40],
+                    "Date of Approval": ["2020-01-01"] * 4,
+                    "End Date": ["2024-01-01"] * 4,
+                }
+            ),
+            "loan_data.csv",
+        )
+        staging = tempfile.TemporaryDirectory()
+        self.addCleanup(staging.cleanup)
+        self.staging_dir = staging.name
+        override = self.settings(IMPORT_STAGING_DIR=self.staging_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_plan_records_customer_id_range_per_shard(self):
+        """Shards are row ranges annotated with the IDs they insert"""
+        shards = plan_import_shards(self.customer_path, 3)
+        self.assertEqual(
+            shards,
+            [
+                {"start": 0, "stop": 3, "customer_ids": [1, 3]},
+                {"start": 3, "stop": 4, "customer_ids": [4, 4]},
+            ],
+        )
+
+    def test_sharded_import_merges_counters(self):
+        """The chord callback merges shard counters into the usual shapes"""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+        result = dispatch_sharded_import(
+            self.customer_path, self.loan_path, shard_size=2
+        ).get()
+
+        self.assertEqual(result["shards"], 2)
+        self.assertTrue(result["customers"]["success"])
+        self.assertEqual(result["customers"]["created"], 4)
+        self.assertEqual(result["loans"]["status"], "success")
+        self.assertEqual(result["loans"]["imported"], 3)
+        self.assertEqual(result["loans"]["errors"], 1)  # customer 77 is unknown
+        self.assertEqual(Loan.objects.get(loan_id=11).customer.first_name, "Jon")
+        self.assertEqual(os.listdir(self.staging_dir), [])
+
+    def test_partition_splits_loans_by_customer_range(self):
+        """Each range gets its own loans; the rest go to the remainder"""
+        paths, remainder = partition_loan_file(
+            self.loan_path, [[1, 2], [3, 4]], self.staging_dir
+        )
+
+        def loan_ids(path):
+            return pd.read_csv(path)["Loan ID"].tolist()
+
+        self.assertEqual(loan_ids(paths[0]), [12, 14])
+        self.assertEqual(loan_ids(paths[1]), [11])
+        self.assertEqual(loan_ids(remainder), [13])
+
+    def test_sharded_import_parses_loan_sheet_once(self):
+        """Shards read their own loan files, never the full sheet"""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+        read_paths = []
+
+        def record(path, *args, **kwargs):
+            read_paths.append(path)
+            return iter_sheet_chunks(path, *args, **kwargs)
+
+        with patch("core.tasks.iter_sheet_chunks", side_effect=record):
+            dispatch_sharded_import(self.customer_path, self.loan_path, shard_size=2)
+
+        self.assertEqual(read_paths.count(self.loan_path), 1)
+
+
+class EligibilityBatchTestCase(APITestCase):
+
+    def setUp(self):
+        self.customers = []
+        for i in range(3):
+            customer = Customer.objects.create(
+                first_name=f"Batch{i}",
+                last_name="Applicant",
+                age=30 + i,
+                phone_number=f"930000000{i}",
+                monthly_salary=60000,
+                approved_limit=2200000,
+                current_debt=0,
+            )
+            Loan.objects.create(
+                customer=customer,
+                loan_amount=100000 * (i + 1),
+                tenure=12,
+                interest_rate=12,
+                monthly_payment=8885 * (i + 1),
+                emis_paid_on_time=6 + i,
+                start_date=date(2023, 1, 1),
+                end_date=date(2024, 1, 1),
+            )
+            self.customers.append(customer)
+
+    def application(self, customer, **overrides):
+        return {
+            "customer_id": customer.customer_id,
+            "loan_amount": 50000,
+            "interest_rate": 13,
+            "tenure": 12,
+            **overrides,
+        }
+
+    def test_batch_matches_single_endpoint(self):
+        """Each batch entry equals the single-application response"""
+        applications = [self.application(c) for c in self.customers]
+
+        response = self.client.post(
+            "/check-eligibility/batch/", applications, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for application, result in zip(applications, response.data):
+            single = self.client.post("/check-eligibility/", application, format="json")
+            self.assertEqual(result, single.data)
+
+    def test_batch_reports_per_item_errors_in_order(self):
+        """Bad entries get an error without failing the rest of the batch"""
+        applications = [
+            self.application(self.customers[0]),
+            {"customer_id": 99999, "loan_amount": 1, "interest_rate": 1, "tenure": 1},
+            self.application(self.customers[1], loan_amount="lots"),
+            self.application(self.customers[2]),
+        ]
+
+        response = self.client.post(
+            "/check-eligibility/batch/", applications, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+        self.assertIn("approval", response.data[0])
+        self.assertEqual(response.data[1]["error"], "Customer not found")
+        self.assertIn("error", response.data[2])
+        self.assertEqual(response.data[3]["customer_id"], self.customers[2].customer_id)
+
+    def test_batch_rejects_unscorable_terms_per_item(self):
+        """Zero or negative terms fail only their own entry"""
+        applications = [
+            self.application(self.customers[0], interest_rate=0),
+            self.application(self.customers[1], tenure=-12),
+            self.application(self.customers[2]),
+        ]
+
+        response = self.client.post(
+            "/check-eligibility/batch/", applications, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for entry in response.data[:2]:
+            self.assertEqual(
+                entry["error"], "loan_amount, interest_rate and tenure must be positive"
+            )
+        self.assertIn("approval", response.data[2])
+
+    def test_batch_query_count_is_constant(self):
+        """Customers and profiles load in bulk regardless of batch size"""
+        applications = [self.application(c) for c in self.customers] * 50
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                "/check-eligibility/batch/", applications, format="json"
+            )
+        self.assertEqual(len(response.data), 150)
+
+    def test_batch_rejects_non_list_and_oversized_bodies(self):
+        """The body must be a list within the configured size"""
+        response = self.client.post(
+            "/check-eligibility/batch/",
+            self.application(self.customers[0]),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.settings(ELIGIBILITY_BATCH_MAX_SIZE=2):
+            response = self.client.post(
+                "/check-eligibility/batch/",
+                [self.application(c) for c in self.customers],
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class VectorizedScoringTestCase(APITestCase):
+
+    def random_portfolio(self, size, seed=7):
+        rng = np.random.default_rng(seed)
+        loan_count = rng.integers(0, 12, size)
+        total_tenure = np.where(
+            loan_count > 0, loan_count * rng.integers(6, 60, size), 0
+        )
+        return {
+            "approved_limit": rng.integers(1, 50, size) * 100000,
+            "monthly_salary": rng.integers(10, 300, size) * 1000,
+            "current_debt": rng.integers(0, 50, size) * 100000.0,
+            "loan_count": loan_count,
+            "total_loan_volume": loan_count * rng.uniform(10000, 500000, size),
+            "total_emis": loan_count * rng.uniform(1000, 20000, size),
+            "emis_paid_on_time": (total_tenure * rng.uniform(0, 1, size)).astype(int),
+            "total_tenure": total_tenure,
+            "current_year_loans": np.minimum(loan_count, rng.integers(0, 5, size)),
+            "loan_amount": rng.uniform(10000, 2000000, size),
+            "interest_rate": rng.choice([8, 10.5, 12, 14.25, 16, 18], size),
+            "tenure": rng.choice([6, 12, 24, 36, 60], size),
+        }
+
+    def test_vectorized_matches_scalar_exactly(self):
+        """Every row of the vectorized engine equals the scalar scorer"""
+        columns = self.random_portfolio(2000)
+        result = score_loan_applications(**columns)
+
+        for i in range(2000):
+            row = {name: values[i].item() for name, values in columns.items()}
+            customer = SimpleNamespace(
+                approved_limit=row["approved_limit"],
+                monthly_salary=row["monthly_salary"],
+                current_debt=row["current_debt"],
+            )
+            history = {
+                name: row[name]
+                for name in (
+                    "loan_count",
+                    "total_loan_volume",
+                    "total_emis",
+                    "emis_paid_on_time",
+                    "total_tenure",
+                    "current_year_loans",
+                )
+            }
+            expected = score_loan_application(
+                customer,
+                row["loan_amount"],
+                row["interest_rate"],
+                row["tenure"],
+                history,
+            )
+            self.assertEqual(
+                {name: values[i].item() for name, values in result.items()},
+                expected,
+            )
+
+    def test_rescore_portfolio_writes_scores(self):
+        """The re-scoring command stores one scalar-identical row per customer"""
+        customers = []
+        for i in range(4):
+            customer = Customer.objects.create(
+                first_name=f"Score{i}",
+                last_name="Target",
+                age=40,
+                phone_number=f"940000000{i}",
+                monthly_salary=50000 + i * 10000,
+                approved_limit=1800000,
+                current_debt=0,
+            )
+            for _ in range(i):
+                Loan.objects.create(
+                    customer=customer,
+                    loan_amount=150000,
+                    tenure=24,
+                    interest_rate=12,
+                    monthly_payment=7061,
+                    emis_paid_on_time=12,
+                    start_date=date(2022, 6, 1),
+                    end_date=date(2024, 6, 1),
+                )
+            customers.append(customer)
+        CustomerCreditProfile.objects.filter(customer=customers[3]).delete()
+
+        call_command(
+            "rescore_portfolio",
+            "--loan-amount=250000",
+            "--interest-rate=13",
+            "--tenure=24",
+            "--chunk-size=3",
+            stdout=StringIO(),
+        )
+
+        run = PortfolioScoreRun.objects.get()
+        self.assertEqual(run.customers_scored, 4)
+        for customer in customers:
+            stored = PortfolioScore.objects.get(run=run, customer=customer)
+            expected = evaluate_loan_eligibility(
+                customer, 250000, 13, 24, Loan.objects.filter(customer=customer)
+            )
+            self.assertEqual(stored.score, expected["score"])
+            self.assertEqual(stored.approval, expected["approval"])
+            self.assertEqual(
+                stored.monthly_installment, expected["monthly_installment"]
+            )
+
+
+class ReadThroughCacheTestCase(SheetFileMixin, APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            first_name="Gita",
+            last_name="Rao",
+            age=33,
+            phone_number="9500000001",
+            monthly_salary=100000,
+            approved_limit=3600000,
+            current_debt=0,
+        )
+        self.loan = Loan.objects.create(
+            loan_id=700,
+            customer=self.customer,
+            loan_amount=200000,
+            tenure=24,
+            interest_rate=11,
+            monthly_payment=9321,
+            emis_paid_on_time=10,
+            start_date=date(2023, 1, 1),
+            end_date=date(2025, 1, 1),
+        )
+
+    def cache_count(self, kind, result):
+        return (
+            REGISTRY.get_sample_value(
+                "credit_cache_requests_total", {"kind": kind, "result": result}
+            )
+            or 0
+        )
+
+    def test_repeated_reads_skip_database(self):
+        """Warm read endpoints are served without any queries"""
+        loans_url = f"/view-loans/{self.customer.customer_id}/"
+        detail_url = f"/view-loan/{self.loan.loan_id}/"
+        cold_loans = self.client.get(loans_url)
+        cold_detail = self.client.get(detail_url)
+        hits = self.cache_count("customer", "hit")
+
+        with self.assertNumQueries(0):
+            warm_loans = self.client.get(loans_url)
+            warm_detail = self.client.get(detail_url)
+
+        self.assertEqual(warm_loans.data, cold_loans.data)
+        self.assertEqual(warm_detail.data, cold_detail.data)
+        self.assertEqual(self.cache_count("customer", "hit"), hits + 2)
+
+    def test_create_loan_invalidates_customer(self):
+        """Creating a loan refreshes the cached loans, debt and profile"""
+        loans_url = f"/view-loans/{self.customer.customer_id}/"
+        self.assertEqual(len(self.client.get(loans_url).data), 1)
+        self.assertEqual(get_credit_history(self.customer)["loan_count"], 1)
+
+        response = self.client.post(
+            "/create-loan/",
+            {
+                "customer_id": self.customer.customer_id,
+                "loan_amount": "100000",
+                "interest_rate": "14",
+                "tenure": "12",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(len(self.client.get(loans_url).data), 2)
+        self.assertEqual(get_credit_history(self.customer)["loan_count"], 2)
+        self.assertEqual(get_customer(self.customer.customer_id).current_debt, 100000)
+
+    def test_import_invalidates_cache(self):
+        """Loans added by the import task show up in cached lookups"""
+        loans_url = f"/view-loans/{self.customer.customer_id}/"
+        self.assertEqual(len(self.client.get(loans_url).data), 1)
+
+        sheet = pd.DataFrame(
+            {
+                "Customer ID": [self.customer.customer_id],
+                "Loan ID": [701],
+                "Loan Amount": [50000],
+                "Tenure": [6],
+                "Interest Rate": [12.5],
+                "Monthly payment": [8700],
+                "EMIs paid on Time": [6],
+                "Date of Approval": pd.to_datetime(["2024-01-01"]),
+                "End Date": pd.to_datetime(["2024-07-01"]),
+            }
+        )
+        result = import_loan_data(self.write_sheet(sheet, "loans.xlsx"))
+        self.assertEqual(result["imported"], 1)
+
+        self.assertEqual(len(self.client.get(loans_url).data), 2)
+        self.assertEqual(get_credit_history(self.customer)["loan_count"], 2)
+
+    def test_cache_outage_falls_back_to_database(self):
+        """A failing cache backend degrades to database reads"""
+        errors = self.cache_count("customer", "error")
+        with patch.object(cache, "get", side_effect=ConnectionError("down")):
+            response = self.client.get(f"/view-loans/{self.customer.customer_id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(self.cache_count("customer", "error"), errors + 1)
+
+
+class CreateLoanLockingTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            first_name="Hari",
+            last_name="Menon",
+            age=38,
+            phone_number="9600000001",
+            monthly_salary=40000,
+            approved_limit=1400000,
+            current_debt=0,
+        )
+
+    def apply(self, loan_amount):
+        return self.client.post(
+            "/create-loan/",
+            {
+                "customer_id": self.customer.customer_id,
+                "loan_amount": str(loan_amount),
+                "interest_rate": "14",
+                "tenure": "12",
+            },
+            format="json",
+        )
+
+    def test_debt_accumulates_across_loans(self):
+        """Each approved loan adds its amount to the stored debt"""
+        self.assertEqual(self.apply(30000).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.apply(40000).status_code, status.HTTP_201_CREATED)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.current_debt, 70000)
+
+    def test_emi_cap_revalidated_under_lock(self):
+        """An approval based on stale data is rejected inside the transaction"""
+        get_credit_history(self.customer)  # warm the cached profile
+        # Another worker commits a loan whose EMIs use up the salary cap;
+        # update() skips the signals, so the cached profile stays stale.
+        CustomerCreditProfile.objects.filter(customer=self.customer).update(
+            loan_count=1, total_emis=19000, total_tenure=12, emis_paid_on_time=12
+        )
+
+        response = self.apply(20000)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["loan_approved"])
+        self.assertFalse(Loan.objects.filter(customer=self.customer).exists())
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.current_debt, 0)
+
+
+@skipUnless(connection.vendor == "postgresql", "needs row-level locking")
+class ConcurrentCreateLoanTestCase(TransactionTestCase):
+
+    def test_parallel_applications_respect_emi_cap(self):
+        """Parallel applications never push EMIs past half the salary"""
+        customer = Customer.objects.create(
+            first_name="Isha",
+            last_name="Kapoor",
+            age=29,
+            phone_number="9600000002",
+            monthly_salary=40000,
+            approved_limit=1400000,
+            current_debt=0,
+        )
+
+        def apply(_):
+            client = APIClient()
+            try:
+                return client.post(
+                    "/create-loan/",
+                    {
+                        "customer_id": customer.customer_id,
+                        "loan_amount": "50000",
+                        "interest_rate": "14",
+                        "tenure": "12",
+                    },
+                    format="json",
+                ).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            codes = list(pool.map(apply, range(16)))
+
+        loans = Loan.objects.filter(customer=customer)
+        customer.refresh_from_db()
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), loans.count())
+        self.assertEqual(customer.current_debt, 50000 * loans.count())
+        self.assertLessEqual(
+            sum(loan.monthly_payment for loan in loans), customer.monthly_salary / 2
+        )
+
+
+class CustomerLoansPaginationTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            first_name="Jaya",
+            last_name="Nair",
+            age=52,
+            phone_number="9700000001",
+            monthly_salary=500000,
+            approved_limit=18000000,
+            current_debt=0,
+        )
+        Loan.objects.bulk_create(
+            Loan(
+                loan_id=1000 + i,
+                customer=self.customer,
+                loan_amount=10000 * (i + 1),
+                tenure=12,
+                interest_rate=10,
+                monthly_payment=880,
+                emis_paid_on_time=i % 12,
+                start_date=date(2022, 1, 1),
+                end_date=date(2023, 1, 1),
+            )
+            for i in range(25)
+        )
+        self.url = f"/view-loans/{self.customer.customer_id}/"
+
+    def test_keyset_pages_cover_every_loan(self):
+        """Following the next cursor walks every loan exactly once"""
+        loan_ids = []
+        response = self.client.get(self.url, {"page_size": 10})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            loan_ids.extend(item["loan_id"] for item in response.data)
+            if "X-Next-Cursor" not in response:
+                break
+            self.assertIn('rel="next"', response["Link"])
+            response = self.client.get(
+                self.url, {"page_size": 10, "cursor": response["X-Next-Cursor"]}
+            )
+
+        self.assertEqual(loan_ids, list(range(1000, 1025)))
+
+    def test_invalid_page_size_rejected(self):
+        """Page sizes outside the configured bounds return 400"""
+        for page_size in ["0", "100000", "ten"]:
+            response = self.client.get(self.url, {"page_size": page_size})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ndjson_streams_remaining_loans(self):
+        """NDJSON requests stream one line per loan after the cursor"""
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {"cursor": 1004}, HTTP_ACCEPT="application/x-ndjson"
+            )
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        items = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([item["loan_id"] for item in items], list(range(1005, 1025)))
+        self.assertEqual(items[0]["repayments_left"], 12 - 5)
+
+    def test_keyset_page_uses_customer_loan_index(self):
+        """Pages are range scans on (customer, loan_id), not sorted history"""
+        page = customer_loan_rows(self.customer.customer_id, after=1004)[:11]
+        sql, params = page.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("loan_customer_loan_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class AsyncViewsTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.customer = Customer.objects.create(
+            first_name="Kiran",
+            last_name="Shah",
+            age=41,
+            phone_number="9800000001",
+            monthly_salary=75000,
+            approved_limit=2700000,
+            current_debt=0,
+        )
+        for i in range(3):
+            Loan.objects.create(
+                loan_id=900 + i,
+                customer=self.customer,
+                loan_amount=120000,
+                tenure=18,
+                interest_rate=12.5,
+                monthly_payment=7350,
+                emis_paid_on_time=i * 4,
+                start_date=date(2023, 5, 1),
+                end_date=date(2024, 11, 1),
+            )
+
+    def test_asgi_middleware_chain_is_not_adapted(self):
+        """Under ASGI no middleware forces requests through a thread"""
+        # Django only logs adapted handlers with DEBUG on.
+        with self.settings(DEBUG=True), self.assertNoLogs(
+            "django.request", level="DEBUG"
+        ):
+            handler = ASGIHandler()
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+
+    async def test_async_whitenoise_serves_static_files(self):
+        """Static files are served by the async WhiteNoise path"""
+
+        async def get_response(request):
+            return JsonResponse({})
+
+        middleware = AsyncWhiteNoiseMiddleware(get_response)
+        middleware.files["/static/app.css"] = middleware.get_static_file(
+            __file__, "/static/app.css"
+        )
+        response = await middleware(self.factory.get("/static/app.css"))
+        self.assertEqual(response.status_code, 200)
+        response = await middleware(self.factory.get("/view-loan/901/"))
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    async def test_async_views_check_write_markers_without_blocking(self):
+        """Replica routing and cache fills await the write marker lookup"""
+        blocking = AssertionError("blocking cache.get on the event loop")
+        with patch("core.routers.replica_configured", return_value=True), patch(
+            "core.routers.wrote_recently", side_effect=blocking
+        ), patch("core.cache.wrote_recently", side_effect=blocking):
+            detail = await async_views.ViewLoanDetail.as_view()(
+                self.factory.get("/view-loan/901/"), loan_id=901
+            )
+            eligibility = await async_views.CheckEligibilityView.as_view()(
+                self.factory.post(
+                    "/check-eligibility/",
+                    {
+                        "customer_id": self.customer.customer_id,
+                        "loan_amount": 50000,
+                        "interest_rate": 12,
+                        "tenure": 12,
+                    },
+                    content_type="application/json",
+                )
+            )
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(eligibility.status_code, 200)
+
+    async def test_read_views_match_sync_views(self):
+        """Async loan detail and loan list return the sync responses"""
+        customer_id = self.customer.customer_id
+        detail = await async_views.ViewLoanDetail.as_view()(
+            self.factory.get("/view-loan/901/"), loan_id=901
+        )
+        loans = await async_views.ViewCustomerLoans.as_view()(
+            self.factory.get(f"/view-loans/{customer_id}/", {"page_size": 2}),
+            customer_id=customer_id,
+        )
+
+        sync_detail = await sync_to_async(self.client.get)("/view-loan/901/")
+        sync_loans = await sync_to_async(self.client.get)(
+            f"/view-loans/{customer_id}/", {"page_size": 2}
+        )
+        self.assertEqual(json.loads(detail.content), sync_detail.json())
+        self.assertEqual(json.loads(loans.content), sync_loans.json())
+        self.assertEqual(loans["X-Next-Cursor"], sync_loans["X-Next-Cursor"])
+
+    async def test_eligibility_matches_sync_view(self):
+        """Async eligibility scores exactly like the sync endpoint"""
+        body = {
+            "customer_id": self.customer.customer_id,
+            "loan_amount": 250000,
+            "interest_rate": 11,
+            "tenure": 24,
+        }
+        response = await async_views.CheckEligibilityView.as_view()(
+            self.factory.post(
+                "/check-eligibility/", body, content_type="application/json"
+            )
+        )
+        sync_response = await sync_to_async(self.client.post)(
+            "/check-eligibility/", body, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), sync_response.json())
+
+    async def test_async_errors(self):
+        """Unknown ids and bad input produce the sync error responses"""
+        view = async_views.ViewCustomerLoans.as_view()
+        missing = await view(self.factory.get("/view-loans/9999/"), customer_id=9999)
+        bad_page = await view(
+            self.factory.get("/", {"page_size": "x"}),
+            customer_id=self.customer.customer_id,
+        )
+        bad_body = await async_views.CheckEligibilityView.as_view()(
+            self.factory.post("/", "{", content_type="application/json")
+        )
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(bad_page.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(bad_body.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_ndjson_stream(self):
+        """The async loan list streams NDJSON when asked to"""
+        response = await async_views.ViewCustomerLoans.as_view()(
+            self.factory.get(
+                "/", {"cursor": 900}, headers={"Accept": "application/x-ndjson"}
+            ),
+            customer_id=self.customer.customer_id,
+        )
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        items = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([item["loan_id"] for item in items], [901, 902])
+
+
+class DatabasePoolCollectorTestCase(APITestCase):
+
+    def test_pool_stats_exported(self):
+        """Pooled aliases report size, waits and wait time from get_stats()"""
+        pool = SimpleNamespace(
+            get_stats=lambda: {
+                "pool_size": 4,
+                "pool_available": 1,
+                "requests_waiting": 2,
+                "requests_num": 120,
+                "requests_queued": 7,
+                "requests_wait_ms": 2500,
+            }
+        )
+
+        class Connections(dict):
+            settings = {
+                "default": {"OPTIONS": {"pool": {"max_size": 4}}},
+                "replica": {"OPTIONS": {}},
+            }
+
+        fake = Connections(default=SimpleNamespace(pool=pool), replica=None)
+        with patch("core.metrics.connections", fake):
+            samples = {
+                (sample.name, sample.labels["alias"]): sample.value
+                for family in DatabasePoolCollector().collect()
+                for sample in family.samples
+            }
+
+        self.assertEqual(samples[("db_pool_size", "default")], 4)
+        self.assertEqual(samples[("db_pool_requests_waiting", "default")], 2)
+        self.assertEqual(samples[("db_pool_requests_queued_total", "default")], 7)
+        self.assertEqual(samples[("db_pool_wait_seconds_total", "default")], 2.5)
+        self.assertNotIn(("db_pool_size", "replica"), samples)
+
+
+@patch("core.routers.replica_configured", return_value=True)
+class ReplicaRoutingTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.customer = Customer.objects.create(
+            first_name="Lata",
+            last_name="Bose",
+            age=36,
+            phone_number="9900000001",
+            monthly_salary=60000,
+            approved_limit=2200000,
+            current_debt=0,
+        )
+        cache.clear()  # forget the write marker left by setUp itself
+
+    def db_for_read(self):
+        # Test cases always run inside a transaction, which pins reads to
+        # the primary; route as a request outside any transaction would.
+        outside_atomic = {"default": SimpleNamespace(in_atomic_block=False)}
+        with patch("core.routers.connections", outside_atomic):
+            return self.router.db_for_read(Customer)
+
+    def test_reads_routed_only_inside_replica_block(self, _):
+        """Reads go to the replica inside replica_reads and nowhere else"""
+        self.assertIsNone(self.db_for_read())
+        with replica_reads(self.customer.customer_id):
+            self.assertEqual(self.db_for_read(), "replica")
+            with primary_reads():
+                self.assertIsNone(self.db_for_read())
+            self.assertEqual(self.router.db_for_write(Customer), "default")
+        self.assertIsNone(self.db_for_read())
+
+    def test_recent_writer_pinned_to_primary(self, _):
+        """A customer's own loan keeps their reads on the primary"""
+        other = Customer.objects.create(
+            first_name="Manoj",
+            last_name="Iyer",
+            age=47,
+            phone_number="9900000002",
+            monthly_salary=60000,
+            approved_limit=2200000,
+            current_debt=0,
+        )
+        cache.clear()
+        response = self.client.post(
+            "/create-loan/",
+            {
+                "customer_id": self.customer.customer_id,
+                "loan_amount": "50000",
+                "interest_rate": "14",
+                "tenure": "12",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with replica_reads(self.customer.customer_id) as on_replica:
+            self.assertFalse(on_replica)
+            self.assertIsNone(self.db_for_read())
+        with replica_reads(other.customer_id) as on_replica:
+            self.assertTrue(on_replica)
+        with replica_reads(other.customer_id, self.customer.customer_id) as on_replica:
+            self.assertFalse(on_replica)
+
+    def test_batch_eligibility_reads_from_replica(self, _):
+        """The batch check reads its customers inside one replica block"""
+        application = {"loan_amount": 50000, "interest_rate": 12, "tenure": 12}
+        with patch("core.views.replica_reads", wraps=replica_reads) as reads:
+            response = self.client.post(
+                "/check-eligibility/batch/",
+                [
+                    {**application, "customer_id": self.customer.customer_id},
+                    {**application, "customer_id": 999999},
+                ],
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(reads.call_args.args), {self.customer.customer_id, 999999})
+
+    def test_loan_detail_falls_back_to_primary(self, _):
+        """A loan missing on the replica is re-read from the primary"""
+        loan = Loan.objects.create(
+            customer=self.customer,
+            loan_amount=90000,
+            tenure=12,
+            interest_rate=13,
+            monthly_payment=8040,
+            emis_paid_on_time=0,
+            start_date=date(2024, 2, 1),
+            end_date=date(2025, 2, 1),
+        )
+        lag = [Loan.DoesNotExist("not replicated yet")]
+
+        def lagging_get_loan(loan_id):
+            if lag:
+                raise lag.pop()
+            return get_loan(loan_id)
+
+        with patch("core.views.get_loan", side_effect=lagging_get_loan):
+            response = self.client.get(f"/view-loan/{loan.loan_id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["loan_id"], loan.loan_id)
+
+    def test_loan_detail_never_caches_stale_replica_rows(self, _):
+        """Inside the write window loan detail fills the cache from the primary"""
+        loan = Loan.objects.create(
+            customer=self.customer,
+            loan_amount=90000,
+            tenure=12,
+            interest_rate=13,
+            monthly_payment=8040,
+            emis_paid_on_time=0,
+            start_date=date(2024, 2, 1),
+            end_date=date(2025, 2, 1),
+        )
+        response = self.client.post(
+            "/create-loan/",
+            {
+                "customer_id": self.customer.customer_id,
+                "loan_amount": "50000",
+                "interest_rate": "14",
+                "tenure": "12",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        current_debt = Customer.objects.get(pk=self.customer.pk).current_debt
+        self.assertGreater(current_debt, 0)
+
+        filter_customers = Customer.objects.filter
+
+        def lagging_replica(**kwargs):
+            customers = filter_customers(**kwargs)
+            if not reading_from_replica():
+                return customers
+            stale = customers.first()
+            stale.current_debt = 0
+            return SimpleNamespace(first=lambda: stale)
+
+        with patch.object(Customer.objects, "filter", side_effect=lagging_replica):
+            response = self.client.get(f"/view-loan/{loan.loan_id}/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            with replica_reads():
+                get_customer(self.customer.customer_id)
+            self.assertEqual(
+                cache.get(f"customer:{self.customer.customer_id}").current_debt,
+                current_debt,
+            )
+
+    def test_replica_reads_in_write_window_are_not_cached(self, _):
+        """A replica row for a customer who just wrote is served but not cached"""
+        mark_recent_write(self.customer.customer_id)
+        with replica_reads():
+            get_customer(self.customer.customer_id)
+        self.assertIsNone(cache.get(f"customer:{self.customer.customer_id}"))
+        with primary_reads():
+            get_customer(self.customer.customer_id)
+        self.assertIsNotNone(cache.get(f"customer:{self.customer.customer_id}"))
+
+
+class ORJSONRendererTestCase(APITestCase):
+
+    def test_render_matches_drf_json_renderer(self):
+        """orjson output is byte-identical to DRF's JSONRenderer"""
+        payload = loan_payload(200)
+        payload.append(
+            {
+                "amount": Decimal("1234.50"),
+                "created": datetime(2024, 3, 1, 9, 30, 15, 123456, tzinfo=UTC),
+                "rate": 0.1 + 0.2,
+                "name": "Zoë",
+            }
+        )
+        self.assertEqual(
+            ORJSONRenderer().render(payload), JSONRenderer().render(payload)
+        )
+
+    def test_parser_round_trip_and_errors(self):
+        """The orjson parser reads what the renderer writes and rejects bad JSON"""
+        payload = loan_payload(20)
+        body = ORJSONRenderer().render(payload)
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body))
+        )
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b"{"))
+
+
+class LeanSerializerTestCase(APITestCase):
+
+    def test_customer_data_matches_model_serializer(self):
+        """customer_data renders fresh and reloaded customers like CustomerSerializer"""
+        customer = Customer.objects.create(
+            first_name="Lean",
+            last_name="Row",
+            age=41,
+            phone_number="5550001111",
+            monthly_salary=52000,
+            approved_limit=1900000,
+            current_debt=0,
+        )
+        for instance in (customer, Customer.objects.get(pk=customer.pk)):
+            expected = CustomerSerializer(instance).data
+            self.assertEqual(customer_data(instance), expected)
+            self.assertEqual(
+                JSONRenderer().render(customer_data(instance)),
+                JSONRenderer().render(expected),
+            )
+
+    def test_register_response_shape_unchanged(self):
+        """The register endpoint returns every customer column"""
+        response = self.client.post(
+            "/register/",
+            {
+                "first_name": "Shape",
+                "last_name": "Check",
+                "age": 30,
+                "phone_number": "5550002222",
+                "monthly_salary": 30000,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        customer = Customer.objects.get(pk=response.data["customer_id"])
+        self.assertEqual(
+            json.loads(response.content), dict(CustomerSerializer(customer).data)
+        )
+
+
+class EndpointBenchmarkTestCase(TransactionTestCase):
+
+    def test_seeded_run_reports_latency_and_queries(self):
+        """The benchmark seeds a deterministic dataset and summarises each endpoint"""
+        customer_ids = seed_dataset(customers=5, loans_per_customer=3, seed=1)
+        self.assertEqual(Loan.objects.count(), 15)
+        self.assertEqual(CustomerCreditProfile.objects.count(), 5)
+        loan_ids = list(Loan.objects.values_list("pk", flat=True))
+        self.assertEqual(
+            build_requests("create-loan", 10, customer_ids, loan_ids, seed=1),
+            build_requests("create-loan", 10, customer_ids, loan_ids, seed=1),
+        )
+
+        requests = build_requests("view-loans", 6, customer_ids, loan_ids)
+        report = run_requests(requests, concurrency=2)
+
+        self.assertEqual(report["requests"], 6)
+        self.assertEqual(report["errors"], 0)
+        self.assertEqual(report["statuses"], {"200": 6})
+        self.assertLessEqual(report["p50_ms"], report["p99_ms"])
+        self.assertGreaterEqual(report["queries_max"], 1)
+
+
+class RequestBudgetMiddlewareTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            first_name="Budget",
+            last_name="Check",
+            age=35,
+            phone_number="5550003333",
+            monthly_salary=80000,
+            approved_limit=2900000,
+            current_debt=0,
+        )
+        self.loan = Loan.objects.create(
+            customer=self.customer,
+            loan_amount=100000,
+            tenure=12,
+            interest_rate=12,
+            monthly_payment=8885,
+            emis_paid_on_time=12,
+            start_date=date(2023, 1, 1),
+            end_date=date(2024, 1, 1),
+        )
+
+    def sample(self, name, view):
+        return REGISTRY.get_sample_value(name, {"view": view}) or 0
+
+    def test_records_queries_and_scoring_time_per_view(self):
+        """Each request observes its query count, DB, cache and scoring time"""
+        before_count = self.sample("credit_view_db_queries_count", "ViewLoanDetail")
+        before_queries = self.sample("credit_view_db_queries_sum", "ViewLoanDetail")
+        before_scoring = self.sample(
+            "credit_view_scoring_seconds_sum", "CheckEligibilityView"
+        )
+
+        self.client.get(f"/view-loan/{self.loan.loan_id}/")
+        self.client.post(
+            "/check-eligibility/",
+            {
+                "customer_id": self.customer.customer_id,
+                "loan_amount": 50000,
+                "interest_rate": 12,
+                "tenure": 12,
+            },
+            format="json",
+        )
+
+        self.assertEqual(
+            self.sample("credit_view_db_queries_count", "ViewLoanDetail"),
+            before_count + 1,
+        )
+        # A cold cache loads the loan and then its customer.
+        self.assertEqual(
+            self.sample("credit_view_db_queries_sum", "ViewLoanDetail"),
+            before_queries + 2,
+        )
+        self.assertGreater(
+            self.sample("credit_view_scoring_seconds_sum", "CheckEligibilityView"),
+            before_scoring,
+        )
+
+    def test_budget_warns_or_raises_in_strict_mode(self):
+        """Going over a view's query budget logs a warning, or raises when strict"""
+        path = f"/view-loan/{self.loan.loan_id}/"
+        with override_settings(
+            QUERY_BUDGETS={"ViewLoanDetail": 0}, QUERY_BUDGET_STRICT=False
+        ):
+            with self.assertLogs("core.middleware", "WARNING") as logs:
+                response = self.client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("over its budget of 0", logs.output[0])
+
+        cache.clear()
+        with override_settings(
+            QUERY_BUDGETS={"ViewLoanDetail": 0}, QUERY_BUDGET_STRICT=True
+        ):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(path)
+
+    def test_stats_are_attached_to_the_request_span(self):
+        """The request's OpenTelemetry span carries its query count and timings"""
+        tracer = TracerProvider().get_tracer(__name__)
+        with tracer.start_as_current_span("request") as span:
+            self.client.get(f"/view-loan/{self.loan.loan_id}/")
+
+        self.assertEqual(span.attributes["credit.view"], "ViewLoanDetail")
+        self.assertEqual(span.attributes["credit.db.queries"], 2)
+        self.assertIn("credit.cache.seconds", span.attributes)
+
+
+class AnnuityFactorTestCase(APITestCase):
+
+    def test_factor_matches_installment_formula(self):
+        """Cached factors reproduce the textbook EMI to the paisa"""
+        for rate, tenure in [(12, 12), (16, 60), (8.5, 6), (14.25, 36)]:
+            monthly_rate = rate / (12 * 100)
+            growth = (1 + monthly_rate) ** tenure
+            expected = 250000 * monthly_rate * growth / (growth - 1)
+            self.assertEqual(
+                round(250000 * annuity_factor(rate, tenure), 2), round(expected, 2)
+            )
+
+        annuity_factor.cache_clear()
+        annuity_factor(12, 24)
+        annuity_factor(12.0, 24)
+        self.assertEqual(annuity_factor.cache_info().hits, 1)
+
+    def test_vectorized_factors_match_scalar_exactly(self):
+        """Batch factors equal the scalar cache for grids and scattered rates"""
+        rng = np.random.default_rng(3)
+        for rates, tenures in [
+            (rng.choice([12.0, 16.0, 10.5], 500), rng.choice([6, 12, 60], 500)),
+            (rng.uniform(1, 30, 500), rng.integers(1, 360, 500)),
+        ]:
+            factors = annuity_factors(rates, tenures)
+            self.assertEqual(
+                factors.tolist(),
+                [
+                    annuity_factor(r, t)
+                    for r, t in zip(rates.tolist(), tenures.tolist())
+                ],
+            )
+        self.assertEqual(annuity_factors(16, [12, 24]).shape, (2,))
+
+
+class LoanScheduleTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            first_name="Sched",
+            last_name="Ule",
+            age=40,
+            phone_number="5550004444",
+            monthly_salary=90000,
+            approved_limit=3200000,
+            current_debt=0,
+        )
+        self.loan = Loan.objects.create(
+            customer=self.customer,
+            loan_amount=120000,
+            tenure=12,
+            interest_rate=12,
+            monthly_payment=round(120000 * annuity_factor(12, 12), 2),
+            emis_paid_on_time=4,
+            start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1),
+        )
+
+    def test_schedules_amortize_to_zero(self):
+        """Installments cover interest first and repay the principal exactly"""
+        amounts = [120000, 50000, 80000]
+        rates = [12, 16, 8.5]
+        payments = [round(a * annuity_factor(r, 12), 2) for a, r in zip(amounts, rates)]
+        principal, interest, balance = amortization_schedules(
+            amounts, payments, rates, 12
+        )
+
+        np.testing.assert_allclose(principal.sum(axis=1), amounts)
+        np.testing.assert_allclose(interest[:, 0], np.array(amounts) * rates / 1200)
+        np.testing.assert_allclose(
+            (principal + interest)[:, :-1], np.repeat([payments], 11, axis=0).T
+        )
+        np.testing.assert_allclose((principal + interest)[:, -1], payments, atol=0.1)
+        self.assertEqual(balance[:, -1].tolist(), [0.0, 0.0, 0.0])
+
+        packed = packed_schedules(
+            amounts + [10000], payments + [1700], rates + [9], [12, 12, 12, 6]
+        )
+        self.assertEqual(unpack_schedule(packed[1]).shape, (3, 12))
+        self.assertEqual(unpack_schedule(packed[3]).shape, (3, 6))
+        np.testing.assert_array_equal(unpack_schedule(packed[2])[2], balance[2])
+
+    def test_schedule_endpoint_stores_schedule_once(self):
+        """The schedule is built on first request and served from storage after"""
+        path = f"/view-loan/{self.loan.loan_id}/schedule/"
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["schedule"]), 12)
+        self.assertEqual(response.data["repayments_left"], 8)
+        self.assertEqual(
+            response.data["outstanding_balance"],
+            response.data["schedule"][3]["balance"],
+        )
+        self.assertEqual(response.data["schedule"][-1]["balance"], 0.0)
+        stored = LoanSchedule.objects.get(loan=self.loan)
+
+        with CaptureQueriesContext(connection) as queries:
+            again = self.client.get(path)
+        self.assertEqual(again.data, response.data)
+        self.assertFalse(any("INSERT" in q["sql"] for q in queries.captured_queries))
+        self.assertEqual(
+            LoanSchedule.objects.get(loan=self.loan).generated_at, stored.generated_at
+        )
+
+        missing = self.client.get("/view-loan/999999/schedule/")
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_backfill_and_invalidation(self):
+        """The backfill task fills gaps and a loan update drops its stale schedule"""
+        result = build_loan_schedules(batch_size=1)
+        self.assertEqual(result["built"], 1)
+        self.assertEqual(build_loan_schedules()["built"], 0)
+        self.assertEqual(build_loan_schedules(rebuild=True)["built"], 1)
+
+        self.loan.tenure = 24
+        self.loan.save()
+        self.assertFalse(LoanSchedule.objects.filter(loan=self.loan).exists())
+
+
+class CurrentDebtRecomputeTestCase(APITestCase):
+
+    def make_customer(self, phone):
+        return Customer.objects.create(
+            first_name="Debt",
+            last_name=phone,
+            age=45,
+            phone_number=phone,
+            monthly_salary=100000,
+            approved_limit=3600000,
+            current_debt=999,
+        )
+
+    def make_loan(self, customer, amount, rate, tenure, paid):
+        return Loan.objects.create(
+            customer=customer,
+            loan_amount=amount,
+            tenure=tenure,
+            interest_rate=rate,
+            monthly_payment=(
+                round(amount * annuity_factor(rate, tenure), 2)
+                if rate
+                else amount / tenure
+            ),
+            emis_paid_on_time=paid,
+            start_date=date(2023, 1, 1),
+            end_date=date(2025, 1, 1),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.borrower = self.make_customer("5550005555")
+        self.partly_paid = self.make_loan(self.borrower, 240000, 12, 24, 10)
+        self.make_loan(self.borrower, 60000, 16, 12, 12)  # fully repaid
+        self.make_loan(self.borrower, 12000, 0, 12, 3)  # interest free
+        self.debt_free = self.make_customer("5550006666")
+
+    def test_full_run_sets_outstanding_principal(self):
+        """current_debt becomes the summed outstanding principal of each customer"""
+        result = recompute_current_debt(full=True)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["rows_touched"], 2)
+        _, _, balance = amortization_schedules(
+            [240000], [self.partly_paid.monthly_payment], [12], 24
+        )
+        self.borrower.refresh_from_db()
+        self.assertAlmostEqual(
+            self.borrower.current_debt, balance[0, 9] + 9000, places=4
+        )
+        self.debt_free.refresh_from_db()
+        self.assertEqual(self.debt_free.current_debt, 0)
+        self.assertEqual(
+            get_customer(self.borrower.pk).current_debt, self.borrower.current_debt
+        )
+
+        run = JobRun.objects.get(pk=result["run_id"])
+        self.assertTrue(run.full)
+        self.assertEqual(run.rows_touched, 2)
+        self.assertIsNotNone(run.duration_seconds)
+
+    def test_incremental_run_only_touches_changed_customers(self):
+        """After a finished run only customers whose loans changed are updated"""
+        recompute_current_debt()
+        self.make_loan(self.debt_free, 50000, 12, 12, 0)
+
+        with patch("core.debt.WATERMARK_OVERLAP", timedelta(0)):
+            result = recompute_current_debt()
+
+        self.assertFalse(result["full"])
+        self.assertEqual(result["rows_touched"], 1)
+        self.debt_free.refresh_from_db()
+        self.assertAlmostEqual(self.debt_free.current_debt, 50000)
+
+    def test_incremental_run_is_scheduled_with_celery_beat(self):
+        """Celery beat runs the incremental recomputation on a fixed interval"""
+        entry = celery_app.conf.beat_schedule["recompute-current-debt"]
+        self.assertEqual(entry["task"], recompute_current_debt.name)
+        self.assertEqual(entry["schedule"], settings.DEBT_RECOMPUTE_SECONDS)
+        self.assertEqual(entry["kwargs"], {"full": False})
+
+
+class LoanRollupTestCase(APITestCase):
+
+    def setUp(self):
+        self.young = Customer.objects.create(
+            first_name="Young",
+            last_name="Roll",
+            age=23,
+            phone_number="5550007777",
+            monthly_salary=40000,
+            approved_limit=1400000,
+        )
+        self.older = Customer.objects.create(
+            first_name="Older",
+            last_name="Roll",
+            age=50,
+            phone_number="5550008888",
+            monthly_salary=90000,
+            approved_limit=3200000,
+        )
+        self.add_loan(self.young, 100000, 12, 12, date(2024, 1, 5))
+        self.add_loan(self.young, 50000, 8.5, 6, date(2024, 1, 20))
+        self.add_loan(self.older, 300000, 16, 60, date(2024, 3, 1))
+
+    def add_loan(self, customer, amount, rate, tenure, start, **fields):
+        return Loan.objects.create(
+            **fields,
+            customer=customer,
+            loan_amount=amount,
+            tenure=tenure,
+            interest_rate=rate,
+            monthly_payment=round(amount * annuity_factor(rate, tenure), 2),
+            emis_paid_on_time=0,
+            start_date=start,
+            end_date=start + timedelta(days=30 * tenure),
+        )
+
+    def buckets(self, dimension):
+        response = self.client.get(f"/analytics/{dimension}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item["bucket"]: item for item in response.data["buckets"]}
+
+    def test_full_refresh_serves_every_dimension(self):
+        """The first refresh builds ordered buckets for each dimension"""
+        result = refresh_loan_rollups()
+        self.assertTrue(result["full"])
+        self.assertEqual(result["rows_touched"], 3)
+
+        months = self.buckets("month")
+        self.assertEqual(list(months), ["2024-01", "2024-03"])
+        self.assertEqual(months["2024-01"]["loan_count"], 2)
+        self.assertEqual(months["2024-01"]["total_amount"], 150000)
+        self.assertEqual(
+            months["2024-01"]["average_interest_rate"], round(1625000 / 150000, 2)
+        )
+        self.assertEqual(list(self.buckets("tenure")), ["6", "12", "60"])
+        self.assertEqual(list(self.buckets("rate_band")), ["8-10%", "12-14%", "16%+"])
+        ages = self.buckets("age_band")
+        self.assertEqual(ages["<25"]["loan_count"], 2)
+        self.assertEqual(ages["45-54"]["average_tenure"], 60)
+
+        response = self.client.get("/analytics/colour/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_incremental_refresh_adds_only_new_loans(self):
+        """Later refreshes fold in loans above the high water mark"""
+        refresh_loan_rollups()
+        self.add_loan(self.older, 20000, 12, 12, date(2024, 3, 15))
+
+        result = refresh_loan_rollups()
+
+        self.assertFalse(result["full"])
+        self.assertEqual(result["rows_touched"], 1)
+        self.assertEqual(self.buckets("month")["2024-03"]["loan_count"], 2)
+        self.assertEqual(self.buckets("tenure")["12"]["loan_count"], 2)
+        self.assertEqual(refresh_loan_rollups()["rows_touched"], 0)
+        self.assertEqual(
+            LoanRollup.objects.get(dimension="month", bucket="2024-03").total_amount,
+            320000,
+        )
+
+    def add_loan_with_id(self, loan_id, start):
+        return self.add_loan(self.older, 10000, 12, 12, start, loan_id=loan_id)
+
+    def test_late_commits_below_high_water_mark_are_folded(self):
+        """IDs missing when a run reads the table are retried by the next runs"""
+        top = Loan.objects.order_by("-loan_id").first().loan_id
+        self.add_loan_with_id(top + 2, date(2024, 3, 20))
+        result = refresh_loan_rollups()
+        self.assertTrue(result["full"])
+        self.assertEqual(result["rows_touched"], 4)
+        self.assertEqual(
+            JobRun.objects.get(pk=result["run_id"]).pending_ids[0][:2],
+            [top + 1, top + 1],
+        )
+
+        # top + 1 commits after the full run, and top + 3 after top + 4.
+        self.add_loan_with_id(top + 1, date(2024, 3, 21))
+        self.add_loan_with_id(top + 4, date(2024, 3, 22))
+        result = refresh_loan_rollups()
+        self.assertEqual(result["rows_touched"], 2)
+        self.add_loan_with_id(top + 3, date(2024, 3, 23))
+        result = refresh_loan_rollups()
+        self.assertEqual(result["rows_touched"], 1)
+        self.assertEqual(JobRun.objects.get(pk=result["run_id"]).pending_ids, [])
+        self.assertEqual(self.buckets("month")["2024-03"]["loan_count"], 5)
+
+    def test_expired_gaps_are_dropped(self):
+        """Missing IDs older than the late-commit window are not retried"""
+        top = Loan.objects.order_by("-loan_id").first().loan_id
+        self.add_loan_with_id(top + 2, date(2024, 3, 20))
+        run_id = refresh_loan_rollups()["run_id"]
+        JobRun.objects.filter(pk=run_id).update(pending_ids=[[top + 1, top + 1, 0]])
+
+        self.add_loan_with_id(top + 1, date(2024, 3, 21))
+        result = refresh_loan_rollups()
+        self.assertEqual(result["rows_touched"], 0)
+        self.assertEqual(self.buckets("month")["2024-03"]["loan_count"], 2)
+
+    def test_refresh_is_scheduled_with_celery_beat(self):
+        """Celery beat runs the incremental refresh on a fixed interval"""
+        entry = celery_app.conf.beat_schedule["refresh-loan-rollups"]
+        self.assertEqual(entry["task"], refresh_loan_rollups.name)
+        self.assertEqual(entry["schedule"], settings.ROLLUP_REFRESH_SECONDS)
+
+
+class ExportParquetTestCase(APITestCase):
+
+    def setUp(self):
+        self.destination = tempfile.mkdtemp()
+        self.customer = Customer.objects.create(
+            first_name="Export",
+            last_name="Tester",
+            age=35,
+            phone_number="5550009999",
+            monthly_salary=60000,
+            approved_limit=2200000,
+        )
+        self.this_month = timezone.localdate().replace(day=1)
+        for start in [date(2024, 1, 5), date(2024, 1, 20), date(2024, 3, 1)]:
+            self.add_loan(start)
+        self.add_loan(self.this_month)
+
+    def tearDown(self):
+        shutil.rmtree(self.destination, ignore_errors=True)
+
+    def add_loan(self, start):
+        return Loan.objects.create(
+            customer=self.customer,
+            loan_amount=100000,
+            tenure=12,
+            interest_rate=12,
+            monthly_payment=8884.88,
+            emis_paid_on_time=0,
+            start_date=start,
+            end_date=start + timedelta(days=360),
+        )
+
+    def test_export_writes_month_partitions(self):
+        """Loans land in one hive partition per start month, customers in one file"""
+        result = export_parquet(self.destination, batch_size=2)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["customers"], 1)
+        self.assertEqual(result["loans"], 4)
+        self.assertEqual(result["partitions_written"], 3)
+
+        loans = ds.dataset(
+            os.path.join(self.destination, "loans"), partitioning="hive"
+        ).to_table()
+        self.assertEqual(loans.num_rows, 4)
+        self.assertEqual(str(loans.schema.field("start_date").type), "date32[day]")
+        months = loans.column("start_month").to_pylist()
+        self.assertEqual(months.count("2024-01"), 2)
+        self.assertIn(f"{self.this_month:%Y-%m}", months)
+
+        customers = pq.read_table(
+            os.path.join(self.destination, "customers", "part-0.parquet")
+        )
+        self.assertEqual(customers.column("phone_number").to_pylist(), ["5550009999"])
+        self.assertEqual(JobRun.objects.get(job="export_parquet").rows_touched, 5)
+
+    def test_rerun_only_writes_new_partitions(self):
+        """Past months already on disk are skipped; the current month is redone"""
+        export_parquet(self.destination)
+        january = loan_partition_path(self.destination, date(2024, 1, 1))
+        exported_at = january.stat().st_mtime_ns
+        self.add_loan(date(2024, 5, 10))
+        self.add_loan(self.this_month)
+
+        result = export_parquet(self.destination)
+        self.assertEqual(result["partitions_written"], 2)
+        self.assertEqual(result["partitions_skipped"], 2)
+        self.assertEqual(result["loans"], 3)
+        self.assertEqual(january.stat().st_mtime_ns, exported_at)
+        current = pq.read_table(loan_partition_path(self.destination, self.this_month))
+        self.assertEqual(current.num_rows, 2)
+
+    def test_keyset_batches_without_server_side_cursors(self):
+        """Behind PgBouncer rows are paged on the sort key with the same result"""
+        loans = Loan.objects.all()
+        order = ["start_date", "loan_id"]
+        streamed = list(iter_batches(loans, ["loan_id"], order, 3))
+        with patch.dict(connection.settings_dict, DISABLE_SERVER_SIDE_CURSORS=True):
+            paged = list(iter_batches(loans, ["loan_id"], order, 3))
+        self.assertEqual([len(batch) for batch in paged], [3, 1])
+        self.assertEqual(paged, streamed)
+
+    def test_command_reports_throughput(self):
+        """The management command runs the export inline and prints rows/s"""
+        out = StringIO()
+        call_command("export_parquet", destination=self.destination, stdout=out)
+        self.assertIn("4 loans", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
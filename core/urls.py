@@ -1,10 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Under an ASGI server the read and eligibility endpoints can be served by
+# their async counterparts, which share request parsing and response shapes.
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path("register/", views.RegisterCustomerView.as_view()),
-    path("check-eligibility/", views.CheckEligibilityView.as_view()),
+    path("check-eligibility/", read_views.CheckEligibilityView.as_view()),
+    path("check-eligibility/batch/", views.CheckEligibilityBatchView.as_view()),
     path("create-loan/", views.CreateLoanView.as_view()),
-    path("view-loan/<int:loan_id>/", views.ViewLoanDetail.as_view()),
-    path("view-loans/<int:customer_id>/", views.ViewCustomerLoans.as_view()),
+    path("view-loan/<int:loan_id>/", read_views.ViewLoanDetail.as_view()),
+    path("view-loan/<int:loan_id>/schedule/", views.ViewLoanSchedule.as_view()),
+    path("analytics/<str:dimension>/", views.ViewLoanAnalytics.as_view()),
+    path("view-loans/<int:customer_id>/", read_views.ViewCustomerLoans.as_view()),
 ]
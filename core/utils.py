@@ -1,25 +1,51 @@
-from datetime import datetime
+from datetime import date, datetime
 
+from django.db.models import Count, Q, Sum
+
+from .amortization import annuity_factor
+from .metrics import timed_function
+
+
+def year_range(year):
+    """Return the half-open ``[start, end)`` date range covering ``year``.
+
+    Filtering on this range instead of extracting the year keeps the
+    predicate usable by the (customer, start_date) index.
+    """
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def aggregate_loan_history(existing_loans, year=None):
+    """Collect every scoring input for ``existing_loans`` in a single query."""
+    year = year or datetime.now().year
+    year_start, year_end = year_range(year)
+    totals = existing_loans.aggregate(
+        loan_count=Count("pk"),
+        total_loan_volume=Sum("loan_amount"),
+        total_emis=Sum("monthly_payment"),
+        emis_paid_on_time=Sum("emis_paid_on_time"),
+        total_tenure=Sum("tenure"),
+        current_year_loans=Count(
+            "pk", filter=Q(start_date__gte=year_start, start_date__lt=year_end)
+        ),
+    )
+    # SUM() over an empty history is NULL; the scorer expects zeros.
+    return {key: value or 0 for key, value in totals.items()}
 
-def evaluate_loan_eligibility(
-    customer, loan_amount, interest_rate, tenure, existing_loans
-):
-    total_loan_volume = sum([loan.loan_amount for loan in existing_loans])
-    total_emis = sum([loan.monthly_payment for loan in existing_loans])
-    current_year_loans = existing_loans.filter(start_date__year=datetime.now().year)
 
+@timed_function("scoring")
+def score_loan_application(customer, loan_amount, interest_rate, tenure, history):
+    """Score an application from pre-aggregated loan ``history``."""
     score = 0
-    if existing_loans.exists():
-        on_time_ratio = sum([loan.emis_paid_on_time for loan in existing_loans]) / sum(
-            [loan.tenure for loan in existing_loans]
-        )
+    if history["loan_count"]:
+        on_time_ratio = history["emis_paid_on_time"] / history["total_tenure"]
         score += min(25, on_time_ratio * 25)
     else:
         score += 10
 
-    score += max(0, 20 - len(existing_loans) * 2)
-    score += max(0, 20 - len(current_year_loans) * 5)
-    score += max(0, 20 - (total_loan_volume / customer.approved_limit) * 20)
+    score += max(0, 20 - history["loan_count"] * 2)
+    score += max(0, 20 - history["current_year_loans"] * 5)
+    score += max(0, 20 - (history["total_loan_volume"] / customer.approved_limit) * 20)
 
     if customer.current_debt > customer.approved_limit:
         score = 0
@@ -43,15 +69,9 @@ def evaluate_loan_eligibility(
     elif score <= 50:
         corrected_rate = max(interest_rate, 12)
 
-    monthly_rate = corrected_rate / (12 * 100)
-    emi = (
-        loan_amount
-        * monthly_rate
-        * ((1 + monthly_rate) ** tenure)
-        / (((1 + monthly_rate) ** tenure) - 1)
-    )
+    emi = loan_amount * annuity_factor(corrected_rate, tenure)
 
-    if emi + total_emis > 0.5 * customer.monthly_salary:
+    if emi + history["total_emis"] > 0.5 * customer.monthly_salary:
         approved = False
 
     return {
@@ -60,3 +80,10 @@ def evaluate_loan_eligibility(
         "corrected_interest_rate": corrected_rate,
         "monthly_installment": round(emi, 2),
     }
+
+
+def evaluate_loan_eligibility(
+    customer, loan_amount, interest_rate, tenure, existing_loans
+):
+    history = aggregate_loan_history(existing_loans)
+    return score_loan_application(customer, loan_amount, interest_rate, tenure, history)
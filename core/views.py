@@ -1,10 +1,35 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Customer, Loan
-from .serializers import CustomerSerializer
+from .models import Customer, Loan, LoanRollup
+from .cache import (
+    customer_loan_rows,
+    get_customer,
+    get_customer_loans,
+    get_loan,
+    invalidate_customer,
+)
+from .renderers import NDJSONRenderer, ndjson_line
+from .routers import primary_reads, replica_reads
+from .rollups import DIMENSIONS, last_refresh
+from .schedules import get_schedule_data
+from .serializers import (
+    customer_data,
+    customer_loan_item,
+    ROLLUP_COLUMNS,
+    loan_detail_data,
+    loan_schedule_data,
+    rollup_item,
+)
 from datetime import datetime, timedelta
-from .utils import evaluate_loan_eligibility
+from .profiles import get_credit_histories, get_credit_history, lock_credit_history
+from .utils import score_loan_application
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from django.db.utils import IntegrityError
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -147,6 +172,28 @@ eligibility_response = openapi.Schema(
     },
 )
 
+eligibility_batch_request = openapi.Schema(
+    type=openapi.TYPE_ARRAY,
+    items=check_eligibility_request,
+    example=[
+        {"customer_id": 87, "loan_amount": 4000, "interest_rate": 12.5, "tenure": 12},
+        {"customer_id": 88, "loan_amount": 9000, "interest_rate": 14, "tenure": 24},
+    ],
+)
+
+eligibility_batch_response = openapi.Schema(
+    type=openapi.TYPE_ARRAY,
+    description="One entry per application, in request order. Entries that "
+    "could not be scored carry an error message instead of a result.",
+    items=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            **eligibility_response.properties,
+            "error": openapi.Schema(type=openapi.TYPE_STRING),
+        },
+    ),
+)
+
 loan_approved_response = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties={
@@ -192,6 +239,56 @@ loan_detail_response = openapi.Schema(
     },
 )
 
+loan_schedule_response = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "loan_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "loan_amount": openapi.Schema(type=openapi.TYPE_NUMBER),
+        "interest_rate": openapi.Schema(type=openapi.TYPE_NUMBER),
+        "monthly_installment": openapi.Schema(type=openapi.TYPE_NUMBER),
+        "tenure": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "repayments_left": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "outstanding_balance": openapi.Schema(type=openapi.TYPE_NUMBER),
+        "schedule": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "installment": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "principal": openapi.Schema(type=openapi.TYPE_NUMBER),
+                    "interest": openapi.Schema(type=openapi.TYPE_NUMBER),
+                    "balance": openapi.Schema(type=openapi.TYPE_NUMBER),
+                },
+            ),
+        ),
+    },
+)
+
+loan_analytics_response = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "dimension": openapi.Schema(type=openapi.TYPE_STRING),
+        "refreshed_at": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+        ),
+        "buckets": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "bucket": openapi.Schema(type=openapi.TYPE_STRING),
+                    "loan_count": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "total_amount": openapi.Schema(type=openapi.TYPE_NUMBER),
+                    "average_amount": openapi.Schema(type=openapi.TYPE_NUMBER),
+                    "average_interest_rate": openapi.Schema(type=openapi.TYPE_NUMBER),
+                    "total_monthly_payment": openapi.Schema(type=openapi.TYPE_NUMBER),
+                    "average_tenure": openapi.Schema(type=openapi.TYPE_NUMBER),
+                },
+            ),
+        ),
+    },
+)
+
 customer_loans_response = openapi.Schema(
     type=openapi.TYPE_ARRAY,
     items=openapi.Schema(
@@ -279,8 +376,7 @@ class RegisterCustomerView(APIView):
                 approved_limit=approved_limit,
                 current_debt=0,
             )
-            serializer = CustomerSerializer(customer)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(customer_data(customer), status=status.HTTP_201_CREATED)
 
         except IntegrityError as e:
             if "phone_number" in str(e):
@@ -299,6 +395,60 @@ class RegisterCustomerView(APIView):
             )
 
 
+def parse_eligibility_request(data):
+    """Return ``(customer_id, loan_amount, interest_rate, tenure)``.
+
+    Raises ValueError with the client-facing message on invalid input.
+    """
+    customer_id = data.get("customer_id")
+    if not customer_id:
+        raise ValueError("customer_id is required")
+    try:
+        return (
+            customer_id,
+            float(data.get("loan_amount")),
+            float(data.get("interest_rate")),
+            int(data.get("tenure")),
+        )
+    except (ValueError, TypeError):
+        raise ValueError("Invalid data types for loan parameters") from None
+
+
+def parse_batch_application(data):
+    """Parse one batch entry into a dict of typed loan parameters.
+
+    On top of ``parse_eligibility_request`` this rejects non-positive
+    amounts, rates and tenures, which cannot be scored. Raises ValueError
+    with the message reported as that entry's ``error``.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Invalid data types for loan parameters")
+    customer_id, loan_amount, interest_rate, tenure = parse_eligibility_request(data)
+    try:
+        customer_id = int(customer_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid data types for loan parameters") from None
+    if loan_amount <= 0 or interest_rate <= 0 or tenure <= 0:
+        raise ValueError("loan_amount, interest_rate and tenure must be positive")
+    return {
+        "customer_id": customer_id,
+        "loan_amount": loan_amount,
+        "interest_rate": interest_rate,
+        "tenure": tenure,
+    }
+
+
+def eligibility_data(customer, interest_rate, tenure, result):
+    return {
+        "customer_id": customer.customer_id,
+        "approval": result["approval"],
+        "interest_rate": interest_rate,
+        "corrected_interest_rate": result["corrected_interest_rate"],
+        "tenure": tenure,
+        "monthly_installment": result["monthly_installment"],
+    }
+
+
 class CheckEligibilityView(APIView):
     @swagger_auto_schema(
         operation_id="check_loan_eligibility",
@@ -331,47 +481,139 @@ class CheckEligibilityView(APIView):
     )
     def post(self, request):
         try:
-            data = request.data
-            customer_id = data.get("customer_id")
+            try:
+                customer_id, loan_amount, interest_rate, tenure = (
+                    parse_eligibility_request(request.data)
+                )
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            with replica_reads(customer_id):
+                try:
+                    customer = get_customer(customer_id)
+                except Customer.DoesNotExist:
+                    return Response(
+                        {"error": "Customer not found"},
+                        status=status.HTTP_404_NOT_FOUND,
+                    )
+                history = get_credit_history(customer)
+
+            result = score_loan_application(
+                customer, loan_amount, interest_rate, tenure, history
+            )
+
+            return Response(eligibility_data(customer, interest_rate, tenure, result))
+
+        except Exception as e:
+            return Response(
+                {"error": f"An error occurred: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
 
-            if not customer_id:
+class CheckEligibilityBatchView(APIView):
+    @swagger_auto_schema(
+        operation_id="check_loan_eligibility_batch",
+        operation_summary="Check loan eligibility for many applications",
+        operation_description="""
+        Score a list of applications in a single request using the same
+        rules as `/check-eligibility/`.
+
+        All referenced customers and their credit profiles are loaded with a
+        constant number of queries, independent of the batch size.
+
+        **Response:** one entry per application, in request order. Invalid
+        applications and unknown customers get an `error` entry instead of
+        failing the whole batch.
+        """,
+        request_body=eligibility_batch_request,
+        responses={
+            200: openapi.Response(
+                "Eligibility checks completed", eligibility_batch_response
+            ),
+            400: openapi.Response("Bad request - invalid batch", error_response),
+        },
+        tags=["Loan Processing"],
+    )
+    def post(self, request):
+        try:
+            applications = request.data
+            if not isinstance(applications, list):
                 return Response(
-                    {"error": "customer_id is required"},
+                    {"error": "Request body must be a list of applications"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-
-            try:
-                loan_amount = float(data.get("loan_amount"))
-                interest_rate = float(data.get("interest_rate"))
-                tenure = int(data.get("tenure"))
-            except (ValueError, TypeError):
+            if len(applications) > settings.ELIGIBILITY_BATCH_MAX_SIZE:
                 return Response(
-                    {"error": "Invalid data types for loan parameters"},
+                    {
+                        "error": "Batch exceeds the maximum of "
+                        f"{settings.ELIGIBILITY_BATCH_MAX_SIZE} applications"
+                    },
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            try:
-                customer = Customer.objects.get(customer_id=customer_id)
-            except Customer.DoesNotExist:
-                return Response(
-                    {"error": "Customer not found"}, status=status.HTTP_404_NOT_FOUND
-                )
+            parsed = []
+            for data in applications:
+                try:
+                    parsed.append(parse_batch_application(data))
+                except ValueError as e:
+                    parsed.append(str(e))
 
-            loans = Loan.objects.filter(customer=customer)
-            result = evaluate_loan_eligibility(
-                customer, loan_amount, interest_rate, tenure, loans
-            )
+            customer_ids = {
+                item["customer_id"] for item in parsed if isinstance(item, dict)
+            }
+            with replica_reads(*customer_ids):
+                customers = Customer.objects.in_bulk(customer_ids)
+                histories = get_credit_histories(list(customers))
 
-            return Response(
-                {
-                    "customer_id": customer.customer_id,
-                    "approval": result["approval"],
-                    "interest_rate": interest_rate,
-                    "corrected_interest_rate": result["corrected_interest_rate"],
-                    "tenure": tenure,
-                    "monthly_installment": result["monthly_installment"],
-                }
-            )
+            results = []
+            for data, item in zip(applications, parsed):
+                if isinstance(item, str):
+                    results.append(
+                        {
+                            "customer_id": (
+                                data.get("customer_id")
+                                if isinstance(data, dict)
+                                else None
+                            ),
+                            "error": item,
+                        }
+                    )
+                    continue
+
+                customer = customers.get(item["customer_id"])
+                if customer is None:
+                    results.append(
+                        {
+                            "customer_id": item["customer_id"],
+                            "error": "Customer not found",
+                        }
+                    )
+                    continue
+
+                try:
+                    result = score_loan_application(
+                        customer,
+                        item["loan_amount"],
+                        item["interest_rate"],
+                        item["tenure"],
+                        histories[customer.customer_id],
+                    )
+                except Exception as e:
+                    results.append(
+                        {
+                            "customer_id": customer.customer_id,
+                            "error": f"An error occurred: {str(e)}",
+                        }
+                    )
+                    continue
+                results.append(
+                    eligibility_data(
+                        customer, item["interest_rate"], item["tenure"], result
+                    )
+                )
+
+            return Response(results, status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response(
@@ -433,44 +675,62 @@ class CreateLoanView(APIView):
                 )
 
             try:
-                customer = Customer.objects.get(customer_id=customer_id)
+                customer = get_customer(customer_id)
             except Customer.DoesNotExist:
                 return Response(
                     {"error": "Customer not found"}, status=status.HTTP_404_NOT_FOUND
                 )
 
-            loans = Loan.objects.filter(customer=customer)
-            result = evaluate_loan_eligibility(
-                customer, loan_amount, interest_rate, tenure, loans
+            # Score against the cached customer first so rejections never
+            # take a lock.
+            history = get_credit_history(customer)
+            result = score_loan_application(
+                customer, loan_amount, interest_rate, tenure, history
             )
-
             if not result["approval"]:
-                return Response(
-                    {
-                        "customer_id": customer.customer_id,
-                        "loan_approved": False,
-                        "message": "Loan cannot be approved due to credit constraints.",
-                        "monthly_installment": result["monthly_installment"],
-                    },
-                    status=status.HTTP_200_OK,
-                )
+                return self.rejected(customer.customer_id, result)
 
             start_date = datetime.now().date()
             end_date = start_date + timedelta(days=30 * tenure)
 
-            loan = Loan.objects.create(
-                customer=customer,
-                loan_amount=loan_amount,
-                tenure=tenure,
-                interest_rate=result["corrected_interest_rate"],
-                monthly_payment=result["monthly_installment"],
-                emis_paid_on_time=0,
-                start_date=start_date,
-                end_date=end_date,
-            )
+            with transaction.atomic():
+                # Only applications for the same customer queue on this lock.
+                customer = (
+                    Customer.objects.select_for_update()
+                    .only(
+                        "customer_id",
+                        "monthly_salary",
+                        "approved_limit",
+                        "current_debt",
+                    )
+                    .get(customer_id=customer.customer_id)
+                )
+                # Re-score under the lock: a concurrent loan may have raised
+                # the debt or the EMIs since the optimistic check.
+                result = score_loan_application(
+                    customer,
+                    loan_amount,
+                    interest_rate,
+                    tenure,
+                    lock_credit_history(customer.customer_id),
+                )
+                if not result["approval"]:
+                    return self.rejected(customer.customer_id, result)
 
-            customer.current_debt += loan_amount
-            customer.save()
+                loan = Loan.objects.create(
+                    customer=customer,
+                    loan_amount=loan_amount,
+                    tenure=tenure,
+                    interest_rate=result["corrected_interest_rate"],
+                    monthly_payment=result["monthly_installment"],
+                    emis_paid_on_time=0,
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+                Customer.objects.filter(customer_id=customer.customer_id).update(
+                    current_debt=F("current_debt") + loan_amount
+                )
+                invalidate_customer(customer.customer_id)
 
             return Response(
                 {
@@ -489,6 +749,18 @@ class CreateLoanView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @staticmethod
+    def rejected(customer_id, result):
+        return Response(
+            {
+                "customer_id": customer_id,
+                "loan_approved": False,
+                "message": "Loan cannot be approved due to credit constraints.",
+                "monthly_installment": result["monthly_installment"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class ViewLoanDetail(APIView):
     @swagger_auto_schema(
@@ -521,48 +793,120 @@ class ViewLoanDetail(APIView):
     )
     def get(self, request, loan_id):
         try:
-            loan = Loan.objects.select_related("customer").get(loan_id=loan_id)
+            with replica_reads() as loan_on_replica:
+                loan = get_loan(loan_id)
+            with replica_reads(loan["customer_id"]) as on_replica:
+                if loan_on_replica and not on_replica:
+                    # Inside the customer's read-your-writes window the
+                    # replica's copy of the loan may be stale as well.
+                    loan = get_loan(loan_id)
+                customer = get_customer(loan["customer_id"])
+        except (Loan.DoesNotExist, Customer.DoesNotExist):
+            # A loan created moments ago may not have replicated yet.
+            try:
+                with primary_reads():
+                    loan = get_loan(loan_id)
+                    customer = get_customer(loan["customer_id"])
+            except (Loan.DoesNotExist, Customer.DoesNotExist):
+                return Response(
+                    {"error": "Loan not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+
+        return Response(loan_detail_data(loan, customer), status=status.HTTP_200_OK)
+
+
+class ViewLoanSchedule(APIView):
+    @swagger_auto_schema(
+        operation_id="get_loan_schedule",
+        operation_summary="Get the amortization schedule of a loan",
+        operation_description="""
+        Retrieve the principal, interest and outstanding balance of every
+        installment of a loan.
+
+        **Returns:**
+        - Loan terms and the balance outstanding after the installments paid
+        - One entry per installment
+        """,
+        manual_parameters=[
+            openapi.Parameter(
+                "loan_id",
+                openapi.IN_PATH,
+                description="Unique loan identifier",
+                type=openapi.TYPE_INTEGER,
+                required=True,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                "Loan schedule retrieved successfully", loan_schedule_response
+            ),
+            404: openapi.Response("Loan not found", error_response),
+        },
+        tags=["Loan Information"],
+    )
+    def get(self, request, loan_id):
+        try:
+            loan = get_loan(loan_id)
         except Loan.DoesNotExist:
             return Response(
                 {"error": "Loan not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        customer = loan.customer
-        is_approved = True
-
-        data = {
-            "loan_id": loan.loan_id,
-            "customer": {
-                "customer_id": customer.customer_id,
-                "first_name": customer.first_name,
-                "last_name": customer.last_name,
-                "phone_number": customer.phone_number,
-                "age": customer.age,
-            },
-            "loan_approved": is_approved,
-            "loan_amount": loan.loan_amount,
-            "interest_rate": loan.interest_rate,
-            "monthly_installment": loan.monthly_payment,
-            "tenure": loan.tenure,
-        }
+        # Schedules are written once, when the loan is imported, backfilled
+        # or first requested here, and read back as a single packed row.
+        data = get_schedule_data(loan)
+        return Response(loan_schedule_data(loan, data), status=status.HTTP_200_OK)
+
+
+def parse_page_params(params):
+    """Return ``(cursor, page_size)`` from the loan list query string.
+
+    Raises ValueError with the client-facing message on invalid input.
+    """
+    try:
+        cursor = params.get("cursor")
+        cursor = None if cursor is None else int(cursor)
+        page_size = int(params.get("page_size", settings.CUSTOMER_LOANS_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("cursor and page_size must be integers") from None
+    if not 1 <= page_size <= settings.CUSTOMER_LOANS_MAX_PAGE_SIZE:
+        raise ValueError(
+            f"page_size must be between 1 and {settings.CUSTOMER_LOANS_MAX_PAGE_SIZE}"
+        )
+    return cursor, page_size
+
 
-        return Response(data, status=status.HTTP_200_OK)
+def next_page_headers(request, next_cursor):
+    """Return the pagination headers pointing at ``next_cursor``."""
+    if next_cursor is None:
+        return {}
+    next_url = replace_query_param(request.build_absolute_uri(), "cursor", next_cursor)
+    return {"X-Next-Cursor": str(next_cursor), "Link": f'<{next_url}>; rel="next"'}
 
 
 class ViewCustomerLoans(APIView):
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
     @swagger_auto_schema(
         operation_id="get_customer_loans",
         operation_summary="Get all loans for a specific customer",
         operation_description="""
-        Retrieve a list of all loans associated with a specific customer.
+        Retrieve the loans associated with a specific customer, in loan ID order.
         
         **Returns:**
-        - List of all customer loans
+        - One page of customer loans
         - Current repayment status for each loan
         - Remaining EMIs for each loan
         
         **Repayments Left Calculation:**
         repayments_left = tenure - emis_paid_on_time
+
+        **Pagination:** when more loans remain, the response carries an
+        `X-Next-Cursor` header and a `Link: <...>; rel="next"` header; pass the
+        cursor back as `?cursor=` to fetch the next page.
+
+        **Streaming:** send `Accept: application/x-ndjson` (or `?format=ndjson`)
+        to stream every loan after `cursor` as newline-delimited JSON.
         """,
         manual_parameters=[
             openapi.Parameter(
@@ -571,37 +915,112 @@ class ViewCustomerLoans(APIView):
                 description="Unique customer identifier",
                 type=openapi.TYPE_INTEGER,
                 required=True,
-            )
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="Return loans with a loan ID greater than this cursor",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "page_size",
+                openapi.IN_QUERY,
+                description="Loans per page",
+                type=openapi.TYPE_INTEGER,
+            ),
         ],
         responses={
             200: openapi.Response(
                 "Customer loans retrieved successfully", customer_loans_response
             ),
+            400: openapi.Response("Invalid cursor or page size", error_response),
             404: openapi.Response("Customer not found", error_response),
         },
         tags=["Loan Information"],
     )
     def get(self, request, customer_id):
-        try:
-            customer = Customer.objects.get(customer_id=customer_id)
-        except Customer.DoesNotExist:
-            return Response(
-                {"error": "Customer not found"}, status=status.HTTP_404_NOT_FOUND
-            )
+        with replica_reads(customer_id):
+            try:
+                get_customer(customer_id)
+            except Customer.DoesNotExist:
+                return Response(
+                    {"error": "Customer not found"}, status=status.HTTP_404_NOT_FOUND
+                )
 
-        loans = Loan.objects.filter(customer=customer)
+            try:
+                cursor, page_size = parse_page_params(request.query_params)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        result = []
-        for loan in loans:
-            repayments_left = loan.tenure - loan.emis_paid_on_time
-            result.append(
-                {
-                    "loan_id": loan.loan_id,
-                    "loan_amount": loan.loan_amount,
-                    "interest_rate": loan.interest_rate,
-                    "monthly_installment": loan.monthly_payment,
-                    "repayments_left": repayments_left,
-                }
+            if request.accepted_renderer.format == NDJSONRenderer.format:
+                rows = customer_loan_rows(customer_id, after=cursor)
+                # The stream is consumed after this block exits, so pin the
+                # database chosen for it now.
+                rows = rows.using(rows.db).iterator(
+                    chunk_size=settings.CUSTOMER_LOANS_MAX_PAGE_SIZE
+                )
+                return StreamingHttpResponse(
+                    (ndjson_line(customer_loan_item(*row)) for row in rows),
+                    content_type=NDJSONRenderer.media_type,
+                )
+
+            rows, next_cursor = get_customer_loans(customer_id, cursor, page_size)
+
+        result = [customer_loan_item(*row) for row in rows]
+        return Response(
+            result,
+            status=status.HTTP_200_OK,
+            headers=next_page_headers(request, next_cursor),
+        )
+
+
+class ViewLoanAnalytics(APIView):
+    @swagger_auto_schema(
+        operation_id="get_loan_analytics",
+        operation_summary="Get portfolio totals by dimension",
+        operation_description="""
+        Retrieve loan counts, volumes and average terms grouped by start
+        month, interest-rate band, tenure or customer age band.
+
+        Served from pre-aggregated rollups refreshed by the
+        refresh_loan_rollups task, never from the raw loan table.
+        """,
+        manual_parameters=[
+            openapi.Parameter(
+                "dimension",
+                openapi.IN_PATH,
+                description="month, rate_band, tenure or age_band",
+                type=openapi.TYPE_STRING,
+                required=True,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                "Portfolio analytics retrieved successfully", loan_analytics_response
+            ),
+            404: openapi.Response("Unknown dimension", error_response),
+        },
+        tags=["Analytics"],
+    )
+    def get(self, request, dimension):
+        if dimension not in DIMENSIONS:
+            return Response(
+                {"error": f"Unknown dimension, choose one of {', '.join(DIMENSIONS)}"},
+                status=status.HTTP_404_NOT_FOUND,
             )
 
-        return Response(result, status=status.HTTP_200_OK)
+        with replica_reads():
+            rows = list(
+                LoanRollup.objects.filter(dimension=dimension)
+                .order_by("sort_key")
+                .values_list(*ROLLUP_COLUMNS)
+            )
+            refreshed_at = last_refresh()
+        return Response(
+            {
+                "dimension": dimension,
+                "refreshed_at": refreshed_at,
+                "buckets": [rollup_item(*row) for row in rows],
+            },
+            status=status.HTTP_200_OK,
+        )
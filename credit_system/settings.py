@@ -11,8 +11,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config, Csv
+from decouple import config, Choices, Csv
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django_prometheus.middleware.PrometheusBeforeMiddleware',
+    "core.middleware.RequestBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,7 +55,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, made async-capable so ASGI requests stay off threads.
+    "core.middleware.AsyncWhiteNoiseMiddleware",
     'django_prometheus.middleware.PrometheusAfterMiddleware',
 ]
 
@@ -88,9 +91,76 @@ DATABASES = {
         "PASSWORD": config("DB_PASSWORD"),
         "HOST": config("DB_HOST"),
         "PORT": config("DB_PORT"),
+        # Reuse connections across requests instead of reconnecting every
+        # time; health checks drop connections the server has closed.
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool),
     }
 }
 
+# Connection pooling for web and Celery processes:
+#   none      - direct connections, reused for CONN_MAX_AGE seconds
+#   psycopg   - a psycopg_pool ConnectionPool per process
+#   pgbouncer - DB_HOST/DB_PORT point at PgBouncer in transaction pooling
+#               mode, so session state (server-side cursors, prepared
+#               statements) must not outlive a transaction
+DB_POOL_MODE = config(
+    "DB_POOL_MODE", default="none", cast=Choices(["none", "psycopg", "pgbouncer"])
+)
+if DB_POOL_MODE == "psycopg":
+    # Django hands connections back to the pool after every request, which
+    # rules out persistent connections.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+            "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+        }
+    }
+elif DB_POOL_MODE == "pgbouncer":
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+    DATABASES["default"]["OPTIONS"] = {"prepare_threshold": None}
+
+# Optional streaming replica for the read-only endpoints and the eligibility
+# scorer. It shares the primary's credentials and pooling options.
+DB_REPLICA_HOST = config("DB_REPLICA_HOST", default="")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "OPTIONS": dict(DATABASES["default"].get("OPTIONS", {})),
+        "HOST": DB_REPLICA_HOST,
+        "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# Seconds a customer's reads stay on the primary after they write, so they
+# see their own new loan; keep it above the replica's usual lag.
+READ_YOUR_WRITES_SECONDS = config("READ_YOUR_WRITES_SECONDS", default=10, cast=int)
+
+# Read-through cache for customer and loan lookups. It lives in its own Redis
+# database so invalidating it never touches the Celery broker.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config("CACHE_URL", default="redis://redis:6379/1"),
+        "TIMEOUT": config("CACHE_TTL", default=300, cast=int),
+        "KEY_PREFIX": "credit",
+    }
+}
+
+# SQL statements one request may issue before RequestBudgetMiddleware logs a
+# warning. QUERY_BUDGETS overrides the default per view class; strict mode
+# raises instead and is on by default under ``manage.py test``.
+QUERY_BUDGET = config("QUERY_BUDGET", default=10, cast=int)
+QUERY_BUDGETS = {
+    # Optimistic read, then the locked re-score, insert and profile update.
+    "CreateLoanView": 16,
+}
+QUERY_BUDGET_STRICT = config(
+    "QUERY_BUDGET_STRICT", default=sys.argv[1:2] == ["test"], cast=bool
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -140,13 +210,86 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
 
+# How often celery beat folds newly created loans into the analytics rollups.
+ROLLUP_REFRESH_SECONDS = config("ROLLUP_REFRESH_SECONDS", default=300, cast=int)
+# How often celery beat recomputes current_debt for customers whose loans
+# changed since the last run.
+DEBT_RECOMPUTE_SECONDS = config("DEBT_RECOMPUTE_SECONDS", default=600, cast=int)
+CELERY_BEAT_SCHEDULE = {
+    "refresh-loan-rollups": {
+        "task": "core.tasks.refresh_loan_rollups",
+        "schedule": ROLLUP_REFRESH_SECONDS,
+    },
+    "recompute-current-debt": {
+        "task": "core.tasks.recompute_current_debt",
+        "schedule": DEBT_RECOMPUTE_SECONDS,
+        "kwargs": {"full": False},
+    },
+}
+
+# Rows read from the spreadsheet and committed per import transaction.
+IMPORT_CHUNK_SIZE = config("IMPORT_CHUNK_SIZE", default=50000, cast=int)
+# Rows inserted per bulk_create/COPY batch by the spreadsheet import tasks.
+IMPORT_BATCH_SIZE = config("IMPORT_BATCH_SIZE", default=5000, cast=int)
+# Customer rows per shard when the import is fanned out across workers.
+IMPORT_SHARD_SIZE = config("IMPORT_SHARD_SIZE", default=100000, cast=int)
+# Stream customer rows through COPY when running on PostgreSQL.
+IMPORT_USE_COPY = config("IMPORT_USE_COPY", default=True, cast=bool)
+# Where a sharded import stages the per-shard loan files; must be shared
+# with the Celery workers.
+IMPORT_STAGING_DIR = config(
+    "IMPORT_STAGING_DIR", default=os.path.join(BASE_DIR, "import_staging")
+)
+
+# Largest number of applications accepted by /check-eligibility/batch/.
+ELIGIBILITY_BATCH_MAX_SIZE = config(
+    "ELIGIBILITY_BATCH_MAX_SIZE", default=5000, cast=int
+)
+
+# Serve the read and eligibility endpoints with async views (ASGI servers).
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# Default and largest page sizes of the /view-loans/ keyset pagination.
+CUSTOMER_LOANS_PAGE_SIZE = config("CUSTOMER_LOANS_PAGE_SIZE", default=100, cast=int)
+CUSTOMER_LOANS_MAX_PAGE_SIZE = config(
+    "CUSTOMER_LOANS_MAX_PAGE_SIZE", default=1000, cast=int
+)
+
+# Customers scored per vectorized chunk by the rescore_portfolio task.
+RESCORE_CHUNK_SIZE = config("RESCORE_CHUNK_SIZE", default=10000, cast=int)
+# Loans amortized and written per batch when backfilling stored schedules.
+SCHEDULE_BATCH_SIZE = config("SCHEDULE_BATCH_SIZE", default=5000, cast=int)
+
+# Directory the export_parquet task writes customers/ and loans/ into, and the
+# rows fetched and written per Parquet record batch.
+EXPORT_DIR = config("EXPORT_DIR", default=os.path.join(BASE_DIR, "exports"))
+EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=50000, cast=int)
+
+# Encode and decode API JSON with orjson instead of the stdlib json module.
+USE_ORJSON = config("USE_ORJSON", default=False, cast=bool)
+# The browsable API renders HTML for every browser request; keep it to DEBUG.
+BROWSABLE_API = config("BROWSABLE_API", default=DEBUG, cast=bool)
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
+        (
+            "core.renderers.ORJSONRenderer"
+            if USE_ORJSON
+            else "rest_framework.renderers.JSONRenderer"
+        ),
+    ]
+    + (["rest_framework.renderers.BrowsableAPIRenderer"] if BROWSABLE_API else []),
+    "DEFAULT_PARSER_CLASSES": [
+        (
+            "core.renderers.ORJSONParser"
+            if USE_ORJSON
+            else "rest_framework.parsers.JSONParser"
+        ),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
 }
 
@@ -26,9 +26,9 @@ print(f'Current customers: {Customer.objects.count()}')
 print(f'Current loans: {Loan.objects.count()}')
 "
 
-echo "📦 Triggering sequential data import via Celery..."
+echo "📦 Triggering sharded data import via Celery..."
 python manage.py shell -c "
-from core.tasks import import_customer_data, import_loan_data, check_data_status
+from core.tasks import dispatch_sharded_import, check_data_status
 import time
 
 print('🔍 Checking initial data status...')
@@ -39,21 +39,14 @@ try:
 except Exception as e:
     print('Error checking initial status:', str(e))
 
-print('📥 Starting customer data import...')
+print('📥 Starting sharded customer and loan import...')
 try:
-    result1 = import_customer_data.delay()
-    customer_result = result1.get(timeout=300)  # 5 minute timeout
-    print('Customer import result:', customer_result)
+    result = dispatch_sharded_import()
+    import_result = result.get(timeout=1800)  # 30 minute timeout
+    print('Customer import result:', import_result['customers'])
+    print('Loan import result:', import_result['loans'])
 except Exception as e:
-    print('Error importing customer data:', str(e))
-
-print('📥 Starting loan data import...')
-try:
-    result2 = import_loan_data.delay()
-    loan_result = result2.get(timeout=300)  # 5 minute timeout
-    print('Loan import result:', loan_result)
-except Exception as e:
-    print('Error importing loan data:', str(e))
+    print('Error importing data:', str(e))
 
 print('🔍 Checking final data status...')
 try:
@@ -77,9 +70,41 @@ if Loan.objects.exists():
     print('Sample loan:', Loan.objects.first().__dict__)
 "
 
-echo "🚀 Starting Gunicorn with OpenTelemetry..."
+# SERVER_MODE selects the HTTP server:
+#   wsgi    - gunicorn gthread workers (default)
+#   asgi    - gunicorn managing uvicorn workers
+#   uvicorn - standalone uvicorn
+# Gunicorn reads its worker, thread and preload settings from
+# gunicorn.conf.py. The ASGI modes switch the read and eligibility
+# endpoints to async views and turn off persistent DB connections, which
+# Django does not reuse across async requests.
+SERVER_MODE=${SERVER_MODE:-wsgi}
+
+case "$SERVER_MODE" in
+  asgi)
+    export ASYNC_VIEWS=${ASYNC_VIEWS:-True}
+    export DB_CONN_MAX_AGE=${DB_CONN_MAX_AGE:-0}
+    server="gunicorn credit_system.asgi:application \
+      --worker-class uvicorn_worker.UvicornWorker"
+    ;;
+  uvicorn)
+    export ASYNC_VIEWS=${ASYNC_VIEWS:-True}
+    export DB_CONN_MAX_AGE=${DB_CONN_MAX_AGE:-0}
+    server="uvicorn credit_system.asgi:application --host 0.0.0.0 --port 8000 \
+      --workers ${WEB_CONCURRENCY:-$(nproc)}"
+    ;;
+  wsgi)
+    server="gunicorn credit_system.wsgi:application"
+    ;;
+  *)
+    echo "❌ Unknown SERVER_MODE '$SERVER_MODE' (expected wsgi, asgi or uvicorn)"
+    exit 1
+    ;;
+esac
+
+echo "🚀 Starting $SERVER_MODE server with OpenTelemetry..."
 exec opentelemetry-instrument \
     --traces_exporter otlp \
     --metrics_exporter none \
     --service_name credit-approval-api \
-    gunicorn credit_system.wsgi:application --bind 0.0.0.0:8000
\ No newline at end of file
+    $server
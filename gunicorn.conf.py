@@ -0,0 +1,52 @@
+"""Gunicorn server profile, tuned through environment variables.
+
+Gunicorn loads this file automatically from the working directory. The
+defaults target production: CPU-scaled gthread workers, the application
+preloaded in the master so workers share its memory copy-on-write, and
+persistent database connections (CONN_MAX_AGE in settings.py) reused
+across requests. Each worker thread holds its own connection, so size
+the database for GUNICORN_WORKERS x GUNICORN_THREADS connections.
+"""
+
+import multiprocessing
+import os
+
+
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# WEB_CONCURRENCY is gunicorn's own convention and wins when set.
+workers = int(
+    os.environ.get(
+        "WEB_CONCURRENCY",
+        os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1),
+    )
+)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+preload_app = env_bool("GUNICORN_PRELOAD", True)
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then to bound slow memory growth; the jitter
+# keeps them from all restarting at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # With preload_app the master imported Django before forking; make sure
+    # no database connection opened there is shared between workers.
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()